@@ -3,8 +3,12 @@
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
+import os
+import stat
+import tempfile
 from pathlib import Path
 from typing import Any
 from typing import Optional
@@ -32,6 +36,16 @@ except ImportError:
     optionals_toml = False
     logger.debug("toml could not be imported, TOML config files not supported")
 
+# import the orjson optional dependency
+try:
+    import orjson
+
+    optionals_orjson = True
+    logger.debug("orjson imported successfully, used for JSON config files")
+except ImportError:
+    optionals_orjson = False
+    logger.debug("orjson could not be imported, falling back to json for config files")
+
 # Create a tuple of acceptable config file extensions, typically used for str.endswith()
 if optionals_yaml and optionals_toml:
     CONFIG_EXTS: tuple[str, ...] = (".json", ".yaml", ".toml")
@@ -42,6 +56,9 @@ elif optionals_toml:
 else:
     CONFIG_EXTS = (".json",)
 
+# Cache of parsed config files keyed by absolute path, storing (mtime_ns, size, contents)
+_config_cache: dict[str, tuple[int, int, dict[str, Any]]] = {}
+
 
 def load_config(
     config_path: str | Path, config_key: str | None = None
@@ -56,19 +73,20 @@ def load_config(
     # check the file type
     _check_file_type(config_path)
 
-    # read the config file
-    with open(config_path) as config_file:
-        if str(config_path).endswith(".json"):
-            logger.debug(f"loading {config_path} as a json file")
-            config = json.load(config_file)
-        elif str(config_path).endswith(".yaml"):
-            logger.debug(f"loading {config_path} as a yaml file")
-            config = yaml.safe_load(config_file)
-        elif str(config_path).endswith(".toml"):
-            logger.debug(f"loading {config_path} as a toml file")
-            config = toml.load(config_file)
-        else:
-            raise NotImplementedError("config file type not supported")
+    # return a copy of the cached contents if the file is unchanged since it was last read
+    cache_key = os.path.abspath(config_path)
+    file_stat = os.stat(config_path)
+    cached = _config_cache.get(cache_key)
+    if cached and cached[:2] == (file_stat.st_mtime_ns, file_stat.st_size):
+        logger.debug(f"loading {config_path} from cache")
+        config = copy.deepcopy(cached[2])
+    else:
+        config = _read_config(config_path)
+        _config_cache[cache_key] = (
+            file_stat.st_mtime_ns,
+            file_stat.st_size,
+            copy.deepcopy(config),
+        )
 
     # return raw data if option set
     if config_key is None:
@@ -76,8 +94,47 @@ def load_config(
         return config
 
     # return the configuration after checking that the config key
+    return select_config(config, config_key, config_path)
+
+
+def _read_config(config_path: str | Path) -> dict[str, Any]:
+    """INTERNAL: Reads and decodes a config file.
+    Positional arguments:
+        config_path (str|Path) -- path to configuration file
+    Returns:
+        config (dict) -- the decoded file contents
+    """
+    # read the config file, json is read in one chunk as bytes and decoded by the parser
+    if str(config_path).endswith(".json"):
+        logger.debug(f"loading {config_path} as a json file")
+        config = _json_loads(Path(config_path).read_bytes())
+    else:
+        # yaml and toml are text formats, always read as UTF-8 regardless of the locale
+        with open(config_path, encoding="utf-8") as config_file:
+            if str(config_path).endswith(".yaml"):
+                logger.debug(f"loading {config_path} as a yaml file")
+                config = yaml.safe_load(config_file)
+            elif str(config_path).endswith(".toml"):
+                logger.debug(f"loading {config_path} as a toml file")
+                config = toml.load(config_file)
+            else:
+                raise NotImplementedError("config file type not supported")
+    return config
+
+
+def select_config(
+    main_config: dict[str, Any], config_key: str, config_path: str | Path
+) -> dict[str, Any]:
+    """INTERNAL: Selects the configuration stored under a key of a loaded config file.
+    Positional arguments:
+        main_config (dict) -- raw contents of the config file
+        config_key (str) -- key of the item storing the configuration
+        config_path (str|Path) -- path to configuration file, used for error messages
+    Returns:
+        config (dict) -- the configuration stored under the key
+    """
     try:
-        return config[config_key]
+        return main_config[config_key]
     except KeyError:
         raise KeyError(
             f"config_key '{config_key}' not found in '{Path(config_path).name}'"
@@ -101,22 +158,92 @@ def dump_config(
         main_config = {}
         logger.debug(f"{config_path} does not yet exist, new file will be created")
 
+    # Skip rewriting the file if the stored configuration is unchanged
+    if main_config.get(config_key) == config:
+        logger.debug(f"{config_path} already contains this configuration, not written")
+        return
+
     # Update values
-    main_config.update({config_key: config})
+    main_config[config_key] = config
 
     # Dump to file
-    with open(config_path, "w") as config_file:
-        if str(config_path).endswith(".json"):
-            logger.debug(f"dumping data to {config_path} as a json file")
-            json.dump(main_config, config_file, indent=4)
-        elif str(config_path).endswith(".yaml"):
-            logger.debug(f"dumping data to {config_path} as a yaml file")
-            yaml.safe_dump(main_config, config_file)
-        elif str(config_path).endswith(".toml"):
-            logger.debug(f"dumping data to {config_path} as a toml file")
-            toml.dump(main_config, config_file)
-        else:
-            raise NotImplementedError("config file type not supported")
+    write_config(main_config, config_path)
+
+
+def write_config(main_config: dict[str, Any], config_path: str | Path) -> None:
+    """INTERNAL: Writes the full contents of a config file, replacing any existing file.
+    Positional arguments:
+        main_config (dict) -- contents of the config file
+        config_path (str|Path) -- path to configuration file
+    """
+    # Invalidate the cached contents, the file is re-read on next load
+    _config_cache.pop(os.path.abspath(config_path), None)
+
+    # Check the file type before anything is written
+    if not str(config_path).endswith((".json", ".yaml", ".toml")):
+        raise NotImplementedError("config file type not supported")
+
+    # Write to a temporary file in the same directory then replace the config file,
+    # so an interrupted write never leaves a partially written config behind
+    config_dir = os.path.dirname(os.path.abspath(config_path))
+    temp_fd, temp_path = tempfile.mkstemp(dir=config_dir, prefix=".", suffix=".tmp")
+    try:
+        # The descriptor is wrapped straight away so it is closed whatever fails
+        with open(temp_fd, "wb") as config_file:
+            # Keep the permissions of an existing config file
+            try:
+                os.chmod(temp_path, stat.S_IMODE(os.stat(config_path).st_mode))
+            except FileNotFoundError:
+                pass
+            # Encode json once and write it in binary mode, avoiding the text layer
+            if str(config_path).endswith(".json"):
+                logger.debug(f"dumping data to {config_path} as a json file")
+                config_file.write(_json_dumps(main_config))
+            elif str(config_path).endswith(".yaml"):
+                logger.debug(f"dumping data to {config_path} as a yaml file")
+                config_file.write(yaml.safe_dump(main_config).encode("utf-8"))
+            else:
+                logger.debug(f"dumping data to {config_path} as a toml file")
+                config_file.write(toml.dumps(main_config).encode("utf-8"))
+            config_file.flush()
+            os.fsync(config_file.fileno())
+        os.replace(temp_path, config_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _json_loads(data: str | bytes) -> Any:
+    """INTERNAL: Decodes JSON using orjson if installed, otherwise the json standard library.
+    Positional arguments:
+        data (str|bytes) -- JSON document
+    Returns:
+        (Any) -- the decoded object
+    """
+    if optionals_orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Any, indent: bool = True) -> bytes:
+    """INTERNAL: Encodes JSON using orjson if installed, otherwise the json standard library.
+    Positional arguments:
+        data (Any) -- object to encode
+    Keyword arguments:
+        indent (bool) -- indent the document for readability, otherwise encode compactly (default = True)
+    Returns:
+        (bytes) -- UTF-8 encoded JSON document, the same with either library
+    """
+    if optionals_orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            # orjson rejects some values json accepts, such as integers over 64 bits
+            logger.debug("orjson could not encode the data, falling back to json")
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 
 def _check_file_type(
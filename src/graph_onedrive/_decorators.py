@@ -2,7 +2,7 @@
 """
 
 import logging
-from datetime import datetime
+import time
 from functools import wraps
 from typing import no_type_check
 
@@ -19,11 +19,8 @@ def token_required(func):
     def wrapper_token(*args, **kwargs):
         # Set self from args to get instance expires attribute
         onedrive_instance = args[0]
-        expires = onedrive_instance._access_expires
-        # Get the current timestamp for comparison
-        now = datetime.timestamp(datetime.now())
-        # Refresh access token if expires does not exist or has expired
-        if expires <= now:
+        # Refresh access token if it has expired, _access_expires is initialised to 0.0
+        if onedrive_instance._access_expires <= time.monotonic():
             logger.info(
                 "access token expired, redeeming refresh token for new access token"
             )
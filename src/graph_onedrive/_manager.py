@@ -29,6 +29,9 @@ def OneDriveManager(
     """
     logger.info("OneDriveManager creating instance")
     onedrive_instance = OneDrive.from_file(config_path, config_key)
-    yield onedrive_instance
-    logger.info("OneDriveManager saving instance configuration to file")
-    onedrive_instance.to_file(config_path, config_key)
+    try:
+        yield onedrive_instance
+        logger.info("OneDriveManager saving instance configuration to file")
+        onedrive_instance.to_file(config_path, config_key)
+    finally:
+        onedrive_instance.close()
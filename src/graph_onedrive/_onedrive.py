@@ -4,36 +4,82 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import copy
+import errno
+import gzip
+import itertools
 import logging
+import mmap
 import os
-import re
+import random
 import secrets
 import shutil
+import stat
 import sys
 import tempfile
+import time
 import urllib.parse
 import warnings
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from collections.abc import Coroutine
+from collections.abc import Iterator
+from collections.abc import Sequence
 from datetime import datetime
-from datetime import timedelta
 from datetime import timezone
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from time import sleep
 from typing import Any
 from typing import Optional
+from typing import TypeVar
+from typing import cast
 
-import aiofiles
 import httpx
 
 from graph_onedrive.__init__ import __version__
+from graph_onedrive._config import _json_dumps
+from graph_onedrive._config import _json_loads
 from graph_onedrive._config import dump_config
 from graph_onedrive._config import load_config
+from graph_onedrive._config import select_config
+from graph_onedrive._config import write_config
 from graph_onedrive._decorators import token_required
 
 
 # Set logger
 logger = logging.getLogger(__name__)
 
+# Result type of the co-routines run by OneDrive._run_async
+_T = TypeVar("_T")
+
+# Process umask, read once on import as it can only be read by setting it. Downloads are
+# written to a private temporary file, which is given the permissions a new file would have
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# import the h2 optional dependency used by httpx for HTTP/2
+try:
+    import h2  # noqa: F401
+
+    optionals_http2 = True
+    logger.debug("h2 imported successfully, HTTP/2 connections enabled")
+except ImportError:
+    optionals_http2 = False
+    logger.debug("h2 could not be imported, HTTP/1.1 connections used")
+
+# import the zstandard optional dependency used to compress uploads
+try:
+    import zstandard
+
+    optionals_zstd = True
+    logger.debug("zstandard imported successfully, zstd upload compression supported")
+except ImportError:
+    optionals_zstd = False
+    logger.debug(
+        "zstandard could not be imported, zstd upload compression not supported"
+    )
+
 
 class GraphAPIError(Exception):
     """Exception raised when Graph API returns an error status."""
@@ -41,6 +87,48 @@ class GraphAPIError(Exception):
     pass
 
 
+class _RetryTransport(httpx.HTTPTransport):
+    """INTERNAL: HTTPX transport that waits and retries throttled requests, refer OneDrive._retry_delay."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = super().handle_request(request)
+            if (
+                response.status_code not in OneDrive._RETRY_STATUS_CODES
+                or attempt >= OneDrive._RETRY_MAX_ATTEMPTS
+            ):
+                return response
+            delay = OneDrive._retry_delay(response, attempt)
+            response.close()
+            logger.warning(
+                f"request throttled (status {response.status_code}), retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+class _AsyncRetryTransport(httpx.AsyncHTTPTransport):
+    """INTERNAL: Asynchronous version of _RetryTransport."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = await super().handle_async_request(request)
+            if (
+                response.status_code not in OneDrive._RETRY_STATUS_CODES
+                or attempt >= OneDrive._RETRY_MAX_ATTEMPTS
+            ):
+                return response
+            delay = OneDrive._retry_delay(response, attempt)
+            await response.aclose()
+            logger.warning(
+                f"request throttled (status {response.status_code}), retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
 class OneDrive:
     """Creates an instance to interact with Microsoft's OneDrive platform through their Graph API.
     Positional arguments:
@@ -55,24 +143,33 @@ class OneDrive:
     Constructor methods:
         from_dict           -- create an instance from a dictionary
         from_file           -- create an instance from a config file
+        from_file_async     -- create an instance from a config file within an event loop
         to_file             -- export an instance configuration to a config file
     Methods:
+        close               -- close the connections to the Graph API, also called when used as a context manager
         get_usage           -- account current usage and total capacity
         list_directory      -- lists all of the items and their attributes within a directory
+        iter_directory      -- iterates over the items and their attributes within a directory
+        iter_directory_async -- asynchronously iterates over the items within a directory, prefetching pages
         search              -- list items matching a seearch query
         detail_item         -- get item details by item id
         detail_item_path    -- get item details by drive path
+        detail_items        -- get the details of multiple items using batched requests
         item_type           -- get item type, folder or file
         is_folder           -- check if an item is a folder
         is_file             -- check if an item is a file
         create_share_link   -- create a sharing link for a file or folder
         make_folder         -- creates a folder
         move_item           -- moves an item
+        move_items          -- moves multiple items into a folder using batched requests
         copy_item           -- copies an item
         rename_item         -- renames an item
+        rename_items        -- renames multiple items using batched requests
         delete_item         -- deletes an item
+        delete_items        -- deletes multiple items using batched requests
         download_file       -- downloads a file to the working directory
         upload_file         -- uploads a file
+        upload_files        -- uploads multiple files, several at a time
     """
 
     # Set class constants for the Graph API
@@ -80,6 +177,48 @@ class OneDrive:
     _API_URL = "https://graph.microsoft.com/" + _API_VERSION + "/"
     _AUTH_BASE_URL = "https://login.microsoftonline.com/"
     _AUTH_ENDPOINT = "/oauth2/v2.0/"
+    # Set class constants for retrying throttled requests
+    _RETRY_STATUS_CODES = (429, 503)
+    _RETRY_MAX_ATTEMPTS = 5
+    _UPLOAD_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    # Upload segments must be a multiple of 320KiB and less than 60MiB
+    _UPLOAD_CHUNK_MULTIPLE = 320 * 1024
+    _UPLOAD_CHUNK_MAX = 60 * 1024**2
+    _UPLOAD_CHUNK_SIZE = _UPLOAD_CHUNK_MULTIPLE * 187
+    # Adaptive segments start at 5MiB and grow while each takes less than the target
+    _UPLOAD_CHUNK_START = _UPLOAD_CHUNK_MULTIPLE * 16
+    _UPLOAD_TARGET_SECONDS = 2.0
+    _UPLOAD_MMAP_MIN_SIZE = 64 * 1024**2
+    _COMPRESS_EXTS = {"gzip": ".gz", "zstd": ".zst"}
+    _SIMPLE_UPLOAD_MAX = 4 * 1024**2
+    _BATCH_MAX_REQUESTS = 20
+    # Graph requests always target the same hosts, keep a few idle connections open
+    _CLIENT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    # File transfers can take minutes to send or receive on slow links
+    _TRANSFER_TIMEOUT = httpx.Timeout(10.0, read=180.0, write=180.0)
+    _LIST_PAGE_SIZE = 999
+    _DETAIL_CACHE_SIZE = 256
+    # Seconds the drive details are reused for when get_usage is asked to refresh
+    _DRIVE_DETAILS_TTL = 30.0
+    _UNIT_DIVISORS = {"b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3}
+    # Decimal places usage is rounded to per unit, None keeps bytes as integers
+    _UNIT_DIGITS = {"b": None, "kb": 1, "mb": 1, "gb": 1}
+    # Only the drive properties read by _get_drive_details are requested
+    _DRIVE_DETAILS_SELECT = "id,name,driveType,owner,quota"
+    # Set by _get_drive_details when first accessed, refer __getattr__
+    _DRIVE_DETAILS_ATTRIBUTES = frozenset(
+        (
+            "_drive_id",
+            "_drive_name",
+            "_drive_type",
+            "_owner_id",
+            "_owner_email",
+            "_owner_name",
+            "_quota_used",
+            "_quota_remaining",
+            "_quota_total",
+        )
+    )
 
     def __init__(
         self,
@@ -103,7 +242,7 @@ class OneDrive:
         if not isinstance(tenant, str):
             raise TypeError(f"tenant expected 'str', got {type(tenant).__name__!r}")
         self._tenant_id = tenant
-        self._auth_url = self._AUTH_BASE_URL + self._tenant_id + self._AUTH_ENDPOINT
+        self._auth_url = f"{self._AUTH_BASE_URL}{self._tenant_id}{self._AUTH_ENDPOINT}"
         self._scope = "offline_access files.readwrite"
         if not isinstance(redirect_url, str):
             raise TypeError(
@@ -111,9 +250,13 @@ class OneDrive:
             )
         self._redirect = redirect_url
         self._drive_path = "me/drive/"
-        self._api_drive_url = self._API_URL + self._drive_path
+        self._api_drive_url = f"{self._API_URL}{self._drive_path}"
         self._access_token = ""
         self._access_expires = 0.0
+        # Least recently used cache of item details, keyed by item id
+        self._detail_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # Monotonic time the drive details were last requested, 0.0 if not yet
+        self._drive_details_time = 0.0
         # Set public attributes
         if refresh_token:
             if not isinstance(refresh_token, str):
@@ -123,18 +266,41 @@ class OneDrive:
             self.refresh_token: str = refresh_token
         else:
             self.refresh_token = ""
+        # Create a client reused for all Graph API requests to keep connections alive,
+        # httpx requests compressed responses and decompresses them by default
+        self._client = httpx.Client(
+            transport=_RetryTransport(http2=optionals_http2, limits=self._CLIENT_LIMITS)
+        )
         # Initiate generation of authorization tokens
         self._get_token()
         self._create_headers()
-        # Set additional attributes from the server
-        self._get_drive_details()
+        # Drive details are requested from the server on first use, refer __getattr__
         logger.debug(
             f"Graph-OneDrive version={__version__}, client_id={client_id}, tenant={tenant}"
         )
 
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not yet set, lazily load the drive details
+        if name in self._DRIVE_DETAILS_ATTRIBUTES:
+            self._get_drive_details()
+            return self.__dict__[name]
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
     def __repr__(self) -> str:
         return f"<OneDrive {self._drive_type} {self._drive_name} {self._owner_name}>"
 
+    def __enter__(self) -> OneDrive:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connections held open to the Graph API."""
+        self._client.close()
+
     @classmethod
     def from_dict(cls, config: dict[str, Any]) -> OneDrive:
         """Create an instance of the OneDrive class from a dictionary.
@@ -156,14 +322,8 @@ class OneDrive:
             client_secret = config["client_secret_value"]
         except KeyError:
             raise KeyError("expected client_secret_value in first level of dictionary")
-        try:
-            redirect_url = config["redirect_url"]
-        except KeyError:
-            redirect_url = "http://localhost:8080"
-        try:
-            refresh_token = config["refresh_token"]
-        except KeyError:
-            refresh_token = None
+        redirect_url = config.get("redirect_url", "http://localhost:8080")
+        refresh_token = config.get("refresh_token")
         # Create OneDrive object instance
         return cls(
             client_id=client_id,
@@ -189,7 +349,7 @@ class OneDrive:
             onedrive_instance (OneDrive) -- OneDrive object instance
         """
         # Check types
-        if not isinstance(file_path, str) and not isinstance(file_path, Path):
+        if not isinstance(file_path, (str, Path)):
             raise TypeError(
                 f"config_path expected 'str' or 'Path', got {type(file_path).__name__!r}"
             )
@@ -198,20 +358,44 @@ class OneDrive:
                 f"config_key expected 'str', got {type(config_key).__name__!r}"
             )
         # Read configuration from config file
-        config_path = Path(file_path)
+        config_path = file_path if isinstance(file_path, Path) else Path(file_path)
         logger.info(f"reading OneDrive configuration from {config_path.name}")
-        config = load_config(config_path, config_key)
+        main_config = load_config(config_path)
+        config = select_config(main_config, config_key, config_path)
         # Create the instance
         onedrive_instance = cls.from_dict(config)
-        # Get refresh token from instance and update config file
-        if save_refresh_token:
+        # Get refresh token from instance and update config file using the contents already read
+        if (
+            save_refresh_token
+            and config.get("refresh_token") != onedrive_instance.refresh_token
+        ):
             logger.info("saving refresh token")
             config["refresh_token"] = onedrive_instance.refresh_token
-            dump_config(config, config_path, config_key)
+            write_config(main_config, config_path)
 
         # Return the OneDrive instance
         return onedrive_instance
 
+    @classmethod
+    async def from_file_async(
+        cls,
+        file_path: str | Path = "config.json",
+        config_key: str = "onedrive",
+        save_refresh_token: bool = False,
+    ) -> OneDrive:
+        """Create an instance of the OneDrive class from a config file without blocking the event loop.
+        The config file access and token requests run in a worker thread so other tasks can run concurrently.
+        Keyword arguments:
+            file_path (str|Path) -- path to configuration file (default = "config.json")
+            config_key (str) -- key of the item storing the configuration (default = "onedrive")
+            save_refresh_token (bool) -- save the refresh token back to the config file during instance initiation (default = False)
+        Returns:
+            onedrive_instance (OneDrive) -- OneDrive object instance
+        """
+        return await asyncio.to_thread(
+            cls.from_file, file_path, config_key, save_refresh_token
+        )
+
     def to_file(
         self, file_path: str | Path = "config.json", config_key: str = "onedrive"
     ) -> None:
@@ -221,7 +405,7 @@ class OneDrive:
             config_key (str) -- key of the item storing the configuration (default = "onedrive")
         """
         # Check types
-        if not isinstance(file_path, str) and not isinstance(file_path, Path):
+        if not isinstance(file_path, (str, Path)):
             raise TypeError(
                 f"file_path expected 'str' or 'Path', got {type(file_path).__name__!r}"
             )
@@ -244,7 +428,7 @@ class OneDrive:
     @staticmethod
     def _raise_unexpected_response(
         response: httpx.Response,
-        expected: int | list[int] = 200,
+        expected: int | tuple[int, ...] | list[int] = 200,
         message: str = "could not complete request",
         has_json: bool = False,
     ) -> None:
@@ -252,41 +436,71 @@ class OneDrive:
         Positional arguments:
             response (Response) -- HTTPX response object
         Keyword arguments:
-            expected (int|[int]) -- valid status checks expected (default = 200)
+            expected (int|(int)) -- valid status checks expected (default = 200)
             message (str) -- exception message to display (default = "could not complete request")
             has_json (bool) -- check the response has json (default = False)
         """
-        # Ensure expected is a list
-        expected = expected if isinstance(expected, list) else [expected]
-        # Check the status code
-        if response.status_code not in expected:
+        # Check the status code, a single expected code is compared directly
+        if isinstance(expected, int):
+            status_ok = response.status_code == expected
+        else:
+            status_ok = response.status_code in expected
+        # Return early in the common case where no json is required
+        if status_ok and not has_json:
+            return
+        # Check the content type rather than parsing, callers parse the json body once themselves
+        # The media type is case insensitive and may be followed by parameters such as charset
+        content_type = response.headers.get("content-type", "")
+        is_json = content_type.lower().startswith("application/json")
+        if not status_ok:
             # Try get the api error message and raise an exception
             graph_error = "no error message returned"
-            if response.headers.get("content-type") == "application/json":
-                api_error = response.json().get("error", {}).get("message")
-                auth_error = response.json().get("error_description")
-                if api_error:
-                    graph_error = api_error
-                elif auth_error:
-                    graph_error = auth_error
-                logger.debug(f"response_json={response.json()}")
+            if is_json:
+                try:
+                    response_data = _json_loads(response.content)
+                except JSONDecodeError:
+                    response_data = None
+                if isinstance(response_data, dict):
+                    # Graph nests the message, OAuth errors use a plain string code
+                    error = response_data.get("error")
+                    api_error = (
+                        error.get("message") if isinstance(error, dict) else None
+                    )
+                    auth_error = response_data.get("error_description")
+                    if api_error:
+                        graph_error = api_error
+                    elif auth_error:
+                        graph_error = auth_error
+                logger.debug(f"response_json={response_data}")
             logger.debug(
                 f"expected_codes={expected}, response_code={response.status_code}, package_error={message}"
             )
             raise GraphAPIError(f"{message} ({graph_error})")
         # Check response has json
-        if has_json:
-            try:
-                response.json()
-            except JSONDecodeError:
-                graph_error = "response did not contain json"
-                raise GraphAPIError(f"{message} ({graph_error})")
+        if has_json and not (is_json and response.content):
+            graph_error = "response did not contain json"
+            raise GraphAPIError(f"{message} ({graph_error})")
+
+    @staticmethod
+    def _retry_delay(response: httpx.Response, attempt: int) -> float:
+        """INTERNAL: Calculates the wait before retrying a throttled request.
+        Uses the Retry-After header when provided, otherwise an exponential backoff with jitter.
+        Positional arguments:
+            response (Response) -- HTTPX response object of the throttled request
+            attempt (int) -- number of the attempt that was throttled, starting at 0
+        Returns:
+            delay (float) -- seconds to wait before retrying
+        """
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+        return min(2**attempt, 32) + random.uniform(0, 1)
 
     def _get_token(self) -> None:
         """INTERNAL: Get access and refresh tokens from the Graph API.
         Calls get_authorization function if an existing refresh token (from a previous session) is not provided.
         """
-        request_url = self._auth_url + "token"
+        request_url = f"{self._auth_url}token"
         # Generate request body as an url encoded query
         query = {
             "client_id": self._client_id,
@@ -304,20 +518,16 @@ class OneDrive:
             query["grant_type"] = "authorization_code"
             query["code"] = self._get_authorization()
 
-        # Set the header and encode the query
-        headers = {"content-type": "application/x-www-form-urlencoded"}
-        query_encoded = urllib.parse.urlencode(query, encoding="utf-8")
-        logger.debug(f"token request query={query_encoded}")
-
-        # Make the request
+        # Make the request, httpx form encodes the query and sets the content type
+        logger.debug(f"token request grant_type={query['grant_type']}")
         logger.info(f"requesting access and refresh tokens from {request_url}")
-        response = httpx.post(request_url, headers=headers, content=query_encoded)
+        response = self._request_without_auth("POST", request_url, data=query)
 
         # Check and parse the response
         self._raise_unexpected_response(
             response, 200, "could not get access token", has_json=True
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
 
         # Set the access and refresh tokens to the instance attributes
         if not response_data.get("access_token"):
@@ -333,10 +543,13 @@ class OneDrive:
             )
 
         # Set an expiry time, removing 60 seconds assumed for processing
-        expires = response_data.get("expires_in", 660) - 60
-        expires = datetime.now() + timedelta(seconds=expires)
-        logger.info(f"access token expires: {expires}")
-        self._access_expires = datetime.timestamp(expires)
+        # Stored as a monotonic clock float so token_required only needs a single
+        # comparison per call and system clock changes do not affect the expiry
+        expires_in = response_data.get("expires_in", 660) - 60
+        self._access_expires = time.monotonic() + expires_in
+        logger.info(
+            f"access token expires: {datetime.fromtimestamp(time.time() + expires_in)}"
+        )
 
     def _get_authorization(self) -> str:
         """INTERNAL: Get authorization code by generating a url for the user to authenticate and authorize the app with.
@@ -345,17 +558,19 @@ class OneDrive:
             Returns:
                 authorization_code (str) -- Graph API authorization code valid once for about 10 mins
         """
-        # Create state used for check
-        alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"  # = string.ascii_letters + string.digits
-        state = "".join(secrets.choice(alphabet) for _ in range(10))
+        # Create state used for check, 8 random bytes as 11 url safe characters
+        state = secrets.token_urlsafe(8)
         # Generate request url
-        request_url = self._auth_url + "authorize"
-        request_url += "?client_id=" + self._client_id
-        request_url += "&response_type=code"
-        request_url += "&redirect_uri=" + urllib.parse.quote(self._redirect, safe="")
-        request_url += "&response_mode=query"
-        request_url += "&scope=" + urllib.parse.quote(self._scope)
-        request_url += "&state=" + state
+        params = {
+            "client_id": self._client_id,
+            "response_type": "code",
+            "redirect_uri": self._redirect,
+            "response_mode": "query",
+            "scope": self._scope,
+            "state": state,
+        }
+        query = urllib.parse.urlencode(params, quote_via=urllib.parse.quote)
+        request_url = f"{self._auth_url}authorize?{query}"
         # Make request (manually)
         print("Manual app authorization required.")
         print("Step 1: Copy the below URL and paste into a web browser.")
@@ -366,10 +581,12 @@ class OneDrive:
         print("You will be redirected (potentially to an error page - this is normal).")
         print("Step 3: Copy the entire response URL address.")
         response = input("Step 4: paste the response here: ").strip()
+        # Parse all the query parameters of the response url in one pass, values are url decoded
+        response_query = urllib.parse.parse_qs(urllib.parse.urlparse(response).query)
         # Verify the state which ensures the response is for this request
-        return_state = re.search("[?|&]state=([^&]+)", response)
+        return_state = response_query.get("state")
         if return_state:
-            if return_state.group(1) != state:
+            if return_state[0] != state:
                 error_message = "response 'state' not for this request, occurs when reusing an old authorization url"
                 logger.error(error_message)
                 raise GraphAPIError(error_message)
@@ -377,44 +594,149 @@ class OneDrive:
             logger.warning(
                 "response 'state' was not in returned url, response not confirmed"
             )
+        # Report the error returned instead of a code, such as when consent was declined
+        if "error" in response_query:
+            error = response_query.get("error_description", response_query["error"])
+            error_message = f"authorization failed ({error[0]})"
+            logger.error(error_message)
+            raise GraphAPIError(error_message)
         # Extract the code from the response
-        authorization_code_re = re.search("[?|&]code=([^&]+)", response)
-        if authorization_code_re is None:
+        authorization_code_values = response_query.get("code")
+        if not authorization_code_values:
             error_message = "response did not contain an authorization code"
             logger.error(error_message)
             raise GraphAPIError(error_message)
-        authorization_code = authorization_code_re.group(1)
+        authorization_code = authorization_code_values[0]
         # Return the authorization code to be used to get tokens
         return authorization_code
 
     def _create_headers(self) -> None:
-        """INTERNAL: Create headers for the http request to the Graph API."""
+        """INTERNAL: Create headers for the http requests to the Graph API, also set on the client."""
         if self._access_token == "":
             raise ValueError("expected self._access_token to be set, got empty string")
         self._headers = {
             "Accept": "*/*",
-            "Authorization": "Bearer " + self._access_token,
+            "Authorization": f"Bearer {self._access_token}",
+        }
+        # Set as the client defaults so requests do not need to pass the headers
+        self._client.headers.update(self._headers)
+
+    def _async_client(
+        self,
+        timeout: httpx.Timeout = httpx.Timeout(5.0),
+        max_connections: int | None = None,
+    ) -> httpx.AsyncClient:
+        """INTERNAL: Creates an async client for Graph API requests, configured like the shared client.
+        Connections use HTTP/2 when h2 is installed, so concurrent requests share one connection.
+        Keyword arguments:
+            timeout (httpx.Timeout) -- request timeouts (default = httpx default of 5 seconds)
+            max_connections (int) -- concurrent requests the pool must serve, if None then the shared client limit (default = None)
+        Returns:
+            client (httpx.AsyncClient) -- client with the instance headers that retries throttled requests
+        """
+        # Size the pool for the caller's concurrency so no request waits for a connection
+        limits = self._CLIENT_LIMITS
+        if max_connections is not None:
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+            )
+        return httpx.AsyncClient(
+            headers=self._headers,
+            timeout=timeout,
+            transport=_AsyncRetryTransport(http2=optionals_http2, limits=limits),
+        )
+
+    @staticmethod
+    def _json_content(body: Any) -> dict[str, Any]:
+        """INTERNAL: Encodes a request body as compact JSON, using orjson if installed.
+        Positional arguments:
+            body (Any) -- object to encode, None for no body
+        Returns:
+            kwargs (dict) -- content and headers keyword arguments for httpx, empty if there is no body
+        """
+        if body is None:
+            return {}
+        return {
+            "content": _json_dumps(body, indent=False),
+            "headers": {"Content-Type": "application/json"},
         }
 
+    @staticmethod
+    def _run_async(coroutine: Coroutine[Any, Any, _T], method_name: str) -> _T:
+        """INTERNAL: Runs a co-routine to completion from a synchronous method.
+        asyncio.run cannot start a loop inside a running one (e.g. Jupyter, async apps), so a clear error is raised instead.
+        Positional arguments:
+            coroutine (Coroutine) -- co-routine to run
+            method_name (str) -- name of the calling public method, used in the error message
+        Returns:
+            result (Any) -- value returned by the co-routine
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # Close the co-routine so it is not reported as never awaited
+        coroutine.close()
+        raise RuntimeError(
+            f"{method_name} cannot be called from a running event loop, "
+            f"use 'await asyncio.to_thread(onedrive.{method_name}, ...)' instead"
+        )
+
+    def _request_without_auth(
+        self, method: str, url: str, follow_redirects: bool = False, **kwargs: Any
+    ) -> httpx.Response:
+        """INTERNAL: Makes a request with the instance client, reusing its connections, but without the authorization header.
+        Used for the identity platform and pre-authenticated urls (upload sessions, copy monitors) which do not accept it.
+        Positional arguments:
+            method (str) -- http method of the request
+            url (str) -- url of the request
+        Keyword arguments:
+            follow_redirects (bool) -- follow redirect responses (default = False)
+            **kwargs -- passed to httpx.Client.build_request
+        Returns:
+            response (Response) -- HTTPX response object
+        """
+        request = self._client.build_request(method, url, **kwargs)
+        request.headers.pop("Authorization", None)
+        return self._client.send(request, follow_redirects=follow_redirects)
+
+    def _item_url(self, item_id: str | None = None, suffix: str = "") -> str:
+        """INTERNAL: Creates the Graph API url of a drive item, or of the drive root if no item id is provided.
+        Keyword arguments:
+            item_id (str) -- item id of the folder or file, None being the root directory (default = None)
+            suffix (str) -- path or query appended to the item url (default = "")
+        Returns:
+            url (str) -- the item url
+        """
+        if item_id:
+            return f"{self._api_drive_url}items/{item_id}{suffix}"
+        return f"{self._api_drive_url}root{suffix}"
+
     @token_required
     def _get_drive_details(self) -> None:
         """INTERNAL: Gets the drive details"""
         # Generate request url
         request_url = self._api_drive_url
-        response = httpx.get(request_url, headers=self._headers)
+        params = {"$select": self._DRIVE_DETAILS_SELECT}
+        response = self._client.get(request_url, params=params)
         self._raise_unexpected_response(
             response, 200, "could not get drive details", has_json=True
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
+        self._drive_details_time = time.monotonic()
         # Set drive details
         self._drive_id = response_data.get("id")
         self._drive_name = response_data.get("name")
         self._drive_type = response_data.get("driveType")
-        response_data_user = response_data.get("owner", {}).get("user", {})
+        # Nested values may be missing or null, they are read as untyped json like the
+        # top level values so the details keep the types returned by the Graph API
+        response_data_owner: Any = response_data.get("owner") or {}
+        response_data_user: Any = response_data_owner.get("user") or {}
         self._owner_id = response_data_user.get("id")
         self._owner_email = response_data_user.get("email")
         self._owner_name = response_data_user.get("displayName")
-        response_data_quota = response_data.get("quota", {})
+        response_data_quota: Any = response_data.get("quota") or {}
         self._quota_used = response_data_quota.get("used")
         self._quota_remaining = response_data_quota.get("remaining")
         self._quota_total = response_data_quota.get("total")
@@ -426,7 +748,7 @@ class OneDrive:
         """Get the current usage and capacity of the connected OneDrive.
         Keyword arguments:
             unit (str) -- unit to return value ["b", "kb", "mb", "gb"] (default = "gb")
-            refresh (bool) -- refresh the usage data (default = False)
+            refresh (bool) -- refresh the usage data if older than 30 seconds (default = False)
             verbose (bool) -- print the usage (default = False)
         Returns:
             used (float) -- storage used in unit requested
@@ -437,26 +759,22 @@ class OneDrive:
         if not isinstance(unit, str):
             raise TypeError(f"unit expected 'str', got {type(unit).__name__!r}")
         unit = unit.lower()
-        if unit not in ("b", "kb", "mb", "gb"):
+        if unit not in self._UNIT_DIVISORS:
             raise ValueError(f"{unit!r} is not a supported unit")
-        # Refresh drive details
-        if refresh:
+        # Refresh drive details unless requested within the ttl, such as when polling
+        if (
+            refresh
+            and time.monotonic() - self._drive_details_time >= self._DRIVE_DETAILS_TTL
+        ):
             self._get_drive_details()
         # Read usage values
         used = self._quota_used
         capacity = self._quota_total
-        # Convert to requested unit unit
-        if unit == "gb":
-            used = round(used / (1024 * 1024 * 1024), 1)
-            capacity = round(capacity / (1024 * 1024 * 1024), 1)
-        elif unit == "mb":
-            used = round(used / (1024 * 1024), 1)
-            capacity = round(capacity / (1024 * 1024), 1)
-        elif unit == "kb":
-            used = round(used / (1024), 1)
-            capacity = round(capacity / (1024), 1)
-        else:
-            unit = "b"
+        # Convert to requested unit
+        divisor = self._UNIT_DIVISORS[unit]
+        digits = self._UNIT_DIGITS[unit]
+        used = round(used / divisor, digits)
+        capacity = round(capacity / divisor, digits)
         # Print usage
         if verbose:
             print(
@@ -476,31 +794,8 @@ class OneDrive:
         Returns:
             items (dict) -- details of all the items within the requested directory
         """
-        # Check if folder id was provided and create the request url
-        if folder_id:
-            if not isinstance(folder_id, str):
-                raise TypeError(
-                    f"folder_id expected 'str', got {type(folder_id).__name__!r}"
-                )
-            request_url = self._api_drive_url + "items/" + folder_id + "/children"
-        else:
-            request_url = self._api_drive_url + "root/children"
-        # Make the Graph API request
-        items_list = []
-        while True:
-            response = httpx.get(request_url, headers=self._headers)
-            # Validate request response and parse
-            self._raise_unexpected_response(
-                response, 200, "directory could not be listed", has_json=True
-            )
-            response_data = response.json()
-            # Add the items to the item list
-            items_list += response_data.get("value", {})
-            # Break if these is no next link, else set the request link
-            if response_data.get("@odata.nextLink") is None:
-                break
-            else:
-                request_url = response_data["@odata.nextLink"]
+        # Get all the items, requesting pages as required
+        items_list = list(self.iter_directory(folder_id))
         # Print the items in the directory along with their item ids
         if verbose:
             for item in items_list:
@@ -508,6 +803,124 @@ class OneDrive:
         # Return the items dictionary
         return items_list
 
+    def iter_directory(self, folder_id: str | None = None) -> Iterator[dict[str, Any]]:
+        """Iterate over the files and folders within the input folder/root of the connected OneDrive.
+        Pages of items are requested as the iteration reaches them, rather than all up front.
+        Keyword arguments:
+            folder_id (str) -- the item id of the folder to look into, None being the root directory (default = None)
+        Returns:
+            items (iterator) -- iterator of the details of the items within the requested directory
+        """
+        # Validate folder id if provided and create the request url
+        if folder_id and not isinstance(folder_id, str):
+            raise TypeError(
+                f"folder_id expected 'str', got {type(folder_id).__name__!r}"
+            )
+        # Request large pages to reduce the number of requests for big directories
+        request_url = self._item_url(
+            folder_id, f"/children?$top={self._LIST_PAGE_SIZE}"
+        )
+        return self._iter_pages(request_url, "directory could not be listed")
+
+    def iter_directory_async(
+        self, folder_id: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Asynchronously iterate over the files and folders within the input folder/root of the connected OneDrive.
+        The next page is requested while the items of the current page are being consumed.
+        Keyword arguments:
+            folder_id (str) -- the item id of the folder to look into, None being the root directory (default = None)
+        Returns:
+            items (async iterator) -- async iterator of the details of the items within the requested directory
+        """
+        # Validate folder id if provided and create the request url
+        if folder_id and not isinstance(folder_id, str):
+            raise TypeError(
+                f"folder_id expected 'str', got {type(folder_id).__name__!r}"
+            )
+        request_url = self._item_url(
+            folder_id, f"/children?$top={self._LIST_PAGE_SIZE}"
+        )
+        return self._iter_pages_async(request_url, "directory could not be listed")
+
+    @token_required
+    def _page_headers(self) -> dict[str, str]:
+        """INTERNAL: Returns the request headers, refreshing the access token if it has expired.
+        Paged responses are consumed at the caller's pace, so the token is checked before each page.
+        Returns:
+            headers (dict) -- the instance headers with a current access token
+        """
+        return self._headers
+
+    def _iter_pages(self, request_url: str, message: str) -> Iterator[dict[str, Any]]:
+        """INTERNAL: Iterates over the items of a paged Graph API collection response, following the next links.
+        Positional arguments:
+            request_url (str) -- url of the first page
+            message (str) -- error message used if a page could not be retrieved
+        Returns:
+            items (iterator) -- iterator of the items within the collection
+        """
+        while True:
+            response = self._client.get(request_url, headers=self._page_headers())
+            # Validate request response and parse
+            self._raise_unexpected_response(response, 200, message, has_json=True)
+            response_data = _json_loads(response.content)
+            # Release the raw page so only the parsed items are held while yielding
+            del response
+            # Yield the items of this page
+            yield from response_data.get("value", [])
+            # Stop if there is no next link, else set the request link
+            if response_data.get("@odata.nextLink") is None:
+                return
+            request_url = response_data["@odata.nextLink"]
+
+    async def _iter_pages_async(
+        self, request_url: str, message: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        """INTERNAL: Asynchronous version of _iter_pages that prefetches the next page.
+        Positional arguments:
+            request_url (str) -- url of the first page
+            message (str) -- error message used if a page could not be retrieved
+        Returns:
+            items (async iterator) -- async iterator of the items within the collection
+        """
+
+        async def get_page(client: httpx.AsyncClient, url: str) -> httpx.Response:
+            # Refreshing the token makes a blocking request, so it runs in a worker thread
+            if self._access_expires <= time.monotonic():
+                headers = await asyncio.to_thread(self._page_headers)
+            else:
+                headers = self._page_headers()
+            return await client.get(url, headers=headers)
+
+        async with self._async_client() as client:
+            next_page: asyncio.Task[httpx.Response] | None = asyncio.create_task(
+                get_page(client, request_url)
+            )
+            try:
+                while next_page is not None:
+                    response = await next_page
+                    # Validate request response and parse
+                    self._raise_unexpected_response(
+                        response, 200, message, has_json=True
+                    )
+                    response_data = _json_loads(response.content)
+                    del response
+                    # Request the next page before yielding the items of this page
+                    next_link = response_data.get("@odata.nextLink")
+                    next_page = (
+                        asyncio.create_task(get_page(client, next_link))
+                        if next_link
+                        else None
+                    )
+                    for item in response_data.get("value", []):
+                        yield item
+            finally:
+                # Stop any prefetch left running if the iteration ended early, and
+                # wait for it so the request ends before the client is closed
+                if next_page is not None:
+                    next_page.cancel()
+                    await asyncio.gather(next_page, return_exceptions=True)
+
     @token_required
     def search(
         self, query: str, top: int = -1, verbose: bool = False
@@ -531,25 +944,12 @@ class OneDrive:
                 "cannot search for blank string. Did you mean list_directory(folder_id=None)?"
             )
         # Build and make the request
-        request_url = self._api_drive_url + f"root/search(q='{query}')"
+        request_url = self._item_url(suffix=f"/search(q='{query}')")
         if top >= 1:
             request_url += f"?$top={top}"
-        # Make the Graph API request
-        items_list = []
-        while True:
-            response = httpx.get(request_url, headers=self._headers)
-            # Validate request response and parse
-            self._raise_unexpected_response(
-                response, 200, "search could not complete", has_json=True
-            )
-            response_data = response.json()
-            # Add the items to the item list
-            items_list += response_data.get("value", {})
-            # Break if these is no next link, else set the request link
-            if len(items_list) >= top or response_data.get("@odata.nextLink") is None:
-                break
-            else:
-                request_url = response_data["@odata.nextLink"]
+        # Make the Graph API requests, following the next links until top items are found
+        items = self._iter_pages(request_url, "search could not complete")
+        items_list = list(itertools.islice(items, top if top >= 1 else None))
         # Print the items in the directory along with their item ids
         if verbose:
             for item in items_list:
@@ -561,33 +961,59 @@ class OneDrive:
         return items_list
 
     @token_required
-    def detail_item(self, item_id: str, verbose: bool = False) -> dict[str, Any]:
+    def detail_item(
+        self, item_id: str, verbose: bool = False, refresh: bool = False
+    ) -> dict[str, Any]:
         """Retrieves the metadata for an item.
+        Details are cached per instance, changes made outside of the instance are only seen with refresh.
         Positional arguments:
             item_id (str) -- item id of the folder or file
         Keyword arguments:
             verbose (bool) -- print the main parts of the item metadata (default = False)
+            refresh (bool) -- request the details even if they are cached (default = False)
         Returns:
             item_details (dict) -- metadata of the requested item
         """
         # Validate item id
         if not isinstance(item_id, str):
             raise TypeError(f"item_id expected 'str', got {type(item_id).__name__!r}")
-        # Create request url based on input item id
-        request_url = self._api_drive_url + "items/" + item_id
-        # Make the Graph API request
-        response = httpx.get(request_url, headers=self._headers)
-        # Validate request response and parse
-        self._raise_unexpected_response(
-            response, 200, "item could not be detailed", has_json=True
-        )
-        response_data = response.json()
+        # Validate refresh
+        if not isinstance(refresh, bool):
+            raise TypeError(f"refresh expected 'bool', got {type(refresh).__name__!r}")
+        if not refresh and item_id in self._detail_cache:
+            # Use the cached details, copied so the cache cannot be modified by the caller
+            self._detail_cache.move_to_end(item_id)
+            response_data = copy.deepcopy(self._detail_cache[item_id])
+        else:
+            # Create request url based on input item id
+            request_url = self._item_url(item_id)
+            # Make the Graph API request
+            response = self._client.get(request_url)
+            # Validate request response and parse
+            self._raise_unexpected_response(
+                response, 200, "item could not be detailed", has_json=True
+            )
+            response_data = _json_loads(response.content)
+            self._cache_item_details(response_data)
         # Print the item details
         if verbose:
             self._print_item_details(response_data)
         # Return the item details
         return response_data
 
+    def _cache_item_details(self, item_details: dict[str, Any]) -> None:
+        """INTERNAL: Adds item details to the cache, removing the least recently used details if full.
+        Positional arguments:
+            item_details (dict) -- metadata of an item including its id
+        """
+        item_id = item_details.get("id")
+        if item_id is None:
+            return
+        self._detail_cache[item_id] = copy.deepcopy(item_details)
+        self._detail_cache.move_to_end(item_id)
+        if len(self._detail_cache) > self._DETAIL_CACHE_SIZE:
+            self._detail_cache.popitem(last=False)
+
     @token_required
     def detail_item_path(self, item_path: str, verbose: bool = False) -> dict[str, Any]:
         """Retrieves the metadata for an item from a web path.
@@ -603,61 +1029,224 @@ class OneDrive:
             raise TypeError(
                 f"item_path expected 'str', got {type(item_path).__name__!r}"
             )
-        # Create request url based on input item id
-        if item_path[0] != "/":
-            item_path = "/" + item_path
-        request_url = self._api_drive_url + "root:" + item_path
+        # Create request url based on input item path, which may not start with a slash
+        request_url = self._item_url(suffix=f":/{item_path.removeprefix('/')}")
         # Make the Graph API request
-        response = httpx.get(request_url, headers=self._headers)
+        response = self._client.get(request_url)
         # Validate request response and parse
         self._raise_unexpected_response(
             response, 200, "item could not be detailed", has_json=True
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
         # Print the item details
         if verbose:
             self._print_item_details(response_data)
         # Return the item details
         return response_data
 
+    @token_required
+    def detail_items(
+        self, item_ids: list[str], max_connections: int = 8, refresh: bool = False
+    ) -> list[dict[str, Any]]:
+        """Retrieves the metadata for multiple items using batched requests.
+        Cached details are used where available, refer detail_item.
+        Positional arguments:
+            item_ids ([str]) -- item ids of the folders or files
+        Keyword arguments:
+            max_connections (int) -- max concurrent open http requests, refer Docs regarding throttling limits (default = 8)
+            refresh (bool) -- request the details even if they are cached (default = False)
+        Returns:
+            items_details ([dict]) -- metadata of the requested items, in the same order as item_ids
+        """
+        # Validate item ids
+        if not isinstance(item_ids, list):
+            raise TypeError(
+                f"item_ids expected 'list', got {type(item_ids).__name__!r}"
+            )
+        for item_id in item_ids:
+            if not isinstance(item_id, str):
+                raise TypeError(
+                    f"item_ids expected list of 'str', got {type(item_id).__name__!r} item"
+                )
+        # Validate max_connections
+        if not isinstance(max_connections, int):
+            raise TypeError(
+                f"max_connections expected 'int', got {type(max_connections).__name__!r}"
+            )
+        # Validate refresh
+        if not isinstance(refresh, bool):
+            raise TypeError(f"refresh expected 'bool', got {type(refresh).__name__!r}")
+        # Collect the cached details, then request the remaining items once each
+        details_by_id: dict[str, dict[str, Any]] = {}
+        if not refresh:
+            for item_id in item_ids:
+                if item_id in self._detail_cache:
+                    self._detail_cache.move_to_end(item_id)
+                    details_by_id[item_id] = self._detail_cache[item_id]
+        missing_ids = [
+            item_id
+            for item_id in dict.fromkeys(item_ids)
+            if item_id not in details_by_id
+        ]
+        if missing_ids:
+            # Make the Graph API requests in batches
+            requests = [
+                ("GET", self._item_url(item_id), None) for item_id in missing_ids
+            ]
+            responses = self._run_async(
+                self._batch_async(requests, max_connections), "detail_items"
+            )
+            # Validate request responses and parse
+            for item_id, response in zip(missing_ids, responses):
+                self._raise_unexpected_response(
+                    response, 200, "item could not be detailed", has_json=True
+                )
+                item_details = _json_loads(response.content)
+                self._cache_item_details(item_details)
+                details_by_id[item_id] = item_details
+        # Return the items details, copied so neither the cache nor repeated ids share them
+        return [copy.deepcopy(details_by_id[item_id]) for item_id in item_ids]
+
+    async def _request_many_async(
+        self,
+        requests: Sequence[tuple[str, str, dict[str, Any] | None]],
+        max_connections: int = 8,
+    ) -> list[httpx.Response]:
+        """INTERNAL: Makes Graph API requests concurrently, retrying throttled requests.
+        Positional arguments:
+            requests ([(str, str, dict)]) -- method, url, and optional json body of each request
+        Keyword arguments:
+            max_connections (int) -- max concurrent open http requests (default = 8)
+        Returns:
+            responses ([Response]) -- HTTPX response objects, in the same order as the requests
+        """
+        # Limit the number of requests in flight at once
+        semaphore = asyncio.Semaphore(max_connections)
+
+        async def send(
+            client: httpx.AsyncClient,
+            method: str,
+            url: str,
+            body: dict[str, Any] | None,
+        ) -> httpx.Response:
+            async with semaphore:
+                return await client.request(method, url, **self._json_content(body))
+
+        # This httpx.AsyncClient instance is shared among the co-routines
+        async with self._async_client(max_connections=max_connections) as client:
+            return await asyncio.gather(
+                *(send(client, method, url, body) for method, url, body in requests)
+            )
+
+    async def _batch_async(
+        self,
+        requests: Sequence[tuple[str, str, dict[str, Any] | None]],
+        max_connections: int = 8,
+    ) -> list[httpx.Response]:
+        """INTERNAL: Combines Graph API requests into $batch requests that are sent concurrently.
+        Each $batch request holds up to 20 requests, throttled requests within a batch are retried.
+        Positional arguments:
+            requests ([(str, str, dict)]) -- method, url, and optional json body of each request
+        Keyword arguments:
+            max_connections (int) -- max concurrent open http requests (default = 8)
+        Returns:
+            responses ([Response]) -- HTTPX response objects, in the same order as the requests
+        """
+        responses: list[httpx.Response | None] = [None] * len(requests)
+        pending = list(range(len(requests)))
+        attempt = 0
+        while pending:
+            # Build the $batch request bodies, the request ids are the request indexes
+            batch_requests = []
+            for n in range(0, len(pending), self._BATCH_MAX_REQUESTS):
+                body: dict[str, list[dict[str, Any]]] = {"requests": []}
+                for index in pending[n : n + self._BATCH_MAX_REQUESTS]:
+                    method, url, json_body = requests[index]
+                    request: dict[str, Any] = {
+                        "id": str(index),
+                        "method": method,
+                        "url": f"/{url.removeprefix(self._API_URL)}",
+                    }
+                    if json_body is not None:
+                        request["body"] = json_body
+                        request["headers"] = {"Content-Type": "application/json"}
+                    body["requests"].append(request)
+                batch_requests.append(("POST", f"{self._API_URL}$batch", body))
+            batch_responses = await self._request_many_async(
+                batch_requests, max_connections
+            )
+            # Unpack the individual responses, collecting throttled requests to retry
+            throttled = []
+            delay = 0.0
+            for batch_response in batch_responses:
+                self._raise_unexpected_response(
+                    batch_response, 200, "batch request failed", has_json=True
+                )
+                for item in _json_loads(batch_response.content)["responses"]:
+                    index = int(item["id"])
+                    # Re-encode the already parsed body compactly, using orjson if installed
+                    sub_body = item.get("body")
+                    response = httpx.Response(
+                        item["status"],
+                        headers=item.get("headers"),
+                        content=(
+                            None
+                            if sub_body is None
+                            else _json_dumps(sub_body, indent=False)
+                        ),
+                    )
+                    if (
+                        response.status_code in self._RETRY_STATUS_CODES
+                        and attempt < self._RETRY_MAX_ATTEMPTS
+                    ):
+                        throttled.append(index)
+                        delay = max(delay, self._retry_delay(response, attempt))
+                    responses[index] = response
+            pending = sorted(throttled)
+            if pending:
+                logger.warning(
+                    f"{len(pending)} batched requests throttled, retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+        return responses  # type: ignore[return-value]
+
     def _print_item_details(self, item_details: dict[str, Any]) -> None:
         """INTERNAL: Prints the details of an item.
         Positional arguments:
             item_details (dict) -- item details in a dictionary format, typically from detail_item method
         """
-        print("item id:", item_details.get("id"))
-        print("name:", item_details.get("name"))
+        # Nested details may be missing or null
+        created: dict[str, Any] = item_details.get("createdBy") or {}
+        created_by: dict[str, Any] = created.get("user") or {}
+        modified: dict[str, Any] = item_details.get("lastModifiedBy") or {}
+        modified_by: dict[str, Any] = modified.get("user") or {}
+        file_system_info = item_details.get("fileSystemInfo") or {}
+        # Collect the lines so the details are printed with a single call
+        lines = [
+            f"item id: {item_details.get('id')}",
+            f"name: {item_details.get('name')}",
+        ]
         if "folder" in item_details:
-            print("type:", "folder")
+            lines.append("type: folder")
         elif "file" in item_details:
-            print("type:", "file")
-        print(
-            "created:",
-            item_details.get("createdDateTime"),
-            "by:",
-            item_details.get("createdBy", {}).get("user", {}).get("displayName"),
-        )
-        print(
-            "last modified:",
-            item_details.get("lastModifiedDateTime"),
-            "by:",
-            item_details.get("lastModifiedBy", {}).get("user", {}).get("displayName"),
-        )
-        print("size:", item_details.get("size"))
-        print("web url:", item_details.get("webUrl"))
-        file_system_info = item_details.get("fileSystemInfo", {})
-        print("file system created:", file_system_info.get("createdDateTime"))
-        print(
-            "file system last modified:",
-            file_system_info.get("lastModifiedDateTime"),
-        )
-        if "file" in item_details.keys():
+            lines.append("type: file")
+        lines += [
+            f"created: {item_details.get('createdDateTime')} by: {created_by.get('displayName')}",
+            f"last modified: {item_details.get('lastModifiedDateTime')} by: {modified_by.get('displayName')}",
+            f"size: {item_details.get('size')}",
+            f"web url: {item_details.get('webUrl')}",
+            f"file system created: {file_system_info.get('createdDateTime')}",
+            f"file system last modified: {file_system_info.get('lastModifiedDateTime')}",
+        ]
+        if "file" in item_details:
             hashes = item_details["file"].get("hashes")
             if isinstance(hashes, dict):
                 for key, value in hashes.items():
-                    print(f"file {key.replace('Hash', '')} hash:", value)
-        if "folder" in item_details.keys():
-            print("child count:", item_details["folder"].get("childCount"))
+                    lines.append(f"file {key.replace('Hash', '')} hash: {value}")
+        if "folder" in item_details:
+            lines.append(f"child count: {item_details['folder'].get('childCount')}")
+        print("\n".join(lines))
 
     def item_type(self, item_id: str) -> str:
         """Returns the item type in str format.
@@ -666,7 +1255,12 @@ class OneDrive:
         Returns:
             type (str) -- "folder" or "file"
         """
-        item_details = self.detail_item(item_id)
+        if isinstance(item_id, str) and item_id in self._detail_cache:
+            # Read the cached details directly, the copy made by detail_item is not needed
+            self._detail_cache.move_to_end(item_id)
+            item_details = self._detail_cache[item_id]
+        else:
+            item_details = self.detail_item(item_id)
         if "folder" in item_details:
             return "folder"
         else:
@@ -679,11 +1273,7 @@ class OneDrive:
         Returns:
             folder (bool) -- True if folder, else false.
         """
-        item_type = self.item_type(item_id)
-        if item_type == "folder":
-            return True
-        else:
-            return False
+        return self.item_type(item_id) == "folder"
 
     def is_file(self, item_id: str) -> bool:
         """Checks if an item is a file.
@@ -692,11 +1282,7 @@ class OneDrive:
         Returns:
             file (bool) -- True if file, else false.
         """
-        item_type = self.item_type(item_id)
-        if item_type == "file":
-            return True
-        else:
-            return False
+        return self.item_type(item_id) == "file"
 
     @token_required
     def create_share_link(
@@ -740,15 +1326,16 @@ class OneDrive:
             raise ValueError(
                 f"password is not available for {self._drive_type} OneDrive accounts"
             )
-        # Verify expiration
-        if expiration is not None and not isinstance(expiration, datetime):
-            raise TypeError(
-                f"expiration expected type 'datetime.datetime', got {type(expiration).__name__!r}"
-            )
-        elif expiration is not None and datetime.now(
-            timezone.utc
-        ) > expiration.astimezone(timezone.utc):
-            raise ValueError("expiration can not be in the past")
+        # Verify expiration, converting it to UTC once for the check and the request
+        expiration_utc = None
+        if expiration is not None:
+            if not isinstance(expiration, datetime):
+                raise TypeError(
+                    f"expiration expected type 'datetime.datetime', got {type(expiration).__name__!r}"
+                )
+            expiration_utc = expiration.astimezone(timezone.utc)
+            if datetime.now(timezone.utc) > expiration_utc:
+                raise ValueError("expiration can not be in the past")
         # Verify scope
         if not isinstance(scope, str):
             raise TypeError(f"scope expected type 'str', got {type(scope).__name__!r}")
@@ -764,33 +1351,30 @@ class OneDrive:
                 f"scope='organization' is not available for {self._drive_type} OneDrive accounts"
             )
         # Create the request url
-        request_url = self._api_drive_url + "items/" + item_id + "/createLink"
+        request_url = self._item_url(item_id, "/createLink")
         # Create the body
         body = {"type": link_type, "scope": scope}
         # Add link password to body if it exists
         if password is not None and password != "":
             body["password"] = password
         # Add link expiration to body if it exists
-        if expiration is not None:
-            expiration_iso = (
-                expiration.astimezone(timezone.utc)
-                .isoformat(timespec="seconds")
-                .replace("+00:00", "Z")
-            )
-            body["expirationDateTime"] = expiration_iso
+        if expiration_utc is not None:
+            body["expirationDateTime"] = expiration_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
         # Make the request
-        response = httpx.post(request_url, headers=self._headers, json=body)
+        response = self._client.post(request_url, **self._json_content(body))
         # Verify and parse the response
         self._raise_unexpected_response(
-            response, [200, 201], "share link could not be created", has_json=True
+            response, (200, 201), "share link could not be created", has_json=True
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
+        # The link may be missing or null, read as untyped json like the response
+        link: Any = response_data.get("link") or {}
         # Extract the html iframe or link and return it
         if link_type == "embed":
-            html_iframe = response_data.get("link", {}).get("webHtml")
+            html_iframe = link.get("webHtml")
             return html_iframe
         else:
-            share_link = response_data.get("link", {}).get("webUrl")
+            share_link = link.get("webUrl")
             return share_link
 
     @token_required
@@ -828,17 +1412,20 @@ class OneDrive:
                 f"if_exists expected 'fail', 'replace', or 'rename', got {if_exists!r}"
             )
         # Create request url based on input parent folder
-        if parent_folder_id:
-            request_url = (
-                self._api_drive_url + "items/" + parent_folder_id + "/children"
-            )
-        else:
-            request_url = self._api_drive_url + "root/children"
-        # Check if folder already exists
+        request_url = self._item_url(parent_folder_id, "/children")
+        # Check if folder already exists by requesting the item at its path, rather than listing the parent
         if check_existing:
-            items = self.list_directory(parent_folder_id)
-            for item in items:
-                if item.get("name") == folder_name and "folder" in item:
+            check_url = self._item_url(
+                parent_folder_id,
+                f":/{urllib.parse.quote(folder_name)}?$select=id,folder",
+            )
+            response = self._client.get(check_url)
+            self._raise_unexpected_response(
+                response, (200, 404), "could not check for existing folder"
+            )
+            if response.status_code == 200:
+                item = _json_loads(response.content)
+                if "folder" in item:
                     return item["id"]
         # Create the request body
         body = {
@@ -847,12 +1434,14 @@ class OneDrive:
             "@microsoft.graph.conflictBehavior": conflict_behavior,
         }
         # Make the Graph API request
-        response = httpx.post(request_url, headers=self._headers, json=body)
+        response = self._client.post(request_url, **self._json_content(body))
         # Validate request response and parse
         self._raise_unexpected_response(
             response, 201, "folder not created", has_json=True
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
+        # The new folder's details are returned, cache them for follow up type checks
+        self._cache_item_details(response_data)
         folder_id = response_data["id"]
         # Return the folder item id
         return folder_id
@@ -883,21 +1472,75 @@ class OneDrive:
         if new_name and not isinstance(new_name, str):
             raise TypeError(f"new_name expected 'str', got {type(new_name).__name__!r}")
         # Create request url based on input item id that should be moved
-        request_url = self._api_drive_url + "items/" + item_id
+        request_url = self._item_url(item_id)
         # Create the request body
         body: dict[str, Any] = {"parentReference": {"id": new_folder_id}}
         if new_name:
             body["name"] = new_name
         # Make the Graph API request
-        response = httpx.patch(request_url, headers=self._headers, json=body)
+        response = self._client.patch(request_url, **self._json_content(body))
         # Validate request response and parse
         self._raise_unexpected_response(response, 200, "item not moved", has_json=True)
-        response_data = response.json()
+        response_data = _json_loads(response.content)
+        self._cache_item_details(response_data)
         item_id = response_data["id"]
         parent_folder_id = response_data["parentReference"]["id"]
         # Return the item id and parent folder id
         return item_id, parent_folder_id
 
+    @token_required
+    def move_items(
+        self, item_ids: list[str], new_folder_id: str, max_connections: int = 8
+    ) -> list[tuple[str, str]]:
+        """Moves multiple items (folders/files) into a folder using batched requests.
+        Positional arguments:
+            item_ids ([str]) -- item ids of the folders or files to move
+            new_folder_id (str) -- item id of the folder to shift the items to
+        Keyword arguments:
+            max_connections (int) -- max concurrent open http requests, refer Docs regarding throttling limits (default = 8)
+        Returns:
+            moved_items ([(str, str)]) -- item id and new parent folder id of each moved item, in the same order as item_ids
+        """
+        # Validate item ids
+        if not isinstance(item_ids, list):
+            raise TypeError(
+                f"item_ids expected 'list', got {type(item_ids).__name__!r}"
+            )
+        for item_id in item_ids:
+            if not isinstance(item_id, str):
+                raise TypeError(
+                    f"item_ids expected list of 'str', got {type(item_id).__name__!r} item"
+                )
+        # Validate new_folder_id
+        if not isinstance(new_folder_id, str):
+            raise TypeError(
+                f"new_folder_id expected 'str', got {type(new_folder_id).__name__!r}"
+            )
+        # Validate max_connections
+        if not isinstance(max_connections, int):
+            raise TypeError(
+                f"max_connections expected 'int', got {type(max_connections).__name__!r}"
+            )
+        # Make the Graph API requests in batches, each with the same body
+        body = {"parentReference": {"id": new_folder_id}}
+        requests = [("PATCH", self._item_url(item_id), body) for item_id in item_ids]
+        responses = self._run_async(
+            self._batch_async(requests, max_connections), "move_items"
+        )
+        # Validate request responses and parse
+        moved_items = []
+        for response in responses:
+            self._raise_unexpected_response(
+                response, 200, "item not moved", has_json=True
+            )
+            response_data = _json_loads(response.content)
+            self._cache_item_details(response_data)
+            moved_items.append(
+                (response_data["id"], response_data["parentReference"]["id"])
+            )
+        # Return the item ids and parent folder ids
+        return moved_items
+
     @token_required
     def copy_item(
         self,
@@ -930,7 +1573,7 @@ class OneDrive:
         if new_name and not isinstance(new_name, str):
             raise TypeError(f"new_name expected 'str', got {type(new_name).__name__!r}")
         # Create request url based on input item id that should be moved
-        request_url = self._api_drive_url + "items/" + item_id + "/copy"
+        request_url = self._item_url(item_id, "/copy")
         # Create the request body
         body: dict[str, Any] = {
             "parentReference": {"driveId": self._drive_id, "id": new_folder_id}
@@ -938,41 +1581,55 @@ class OneDrive:
         if new_name:
             body["name"] = new_name
         # Make the Graph API request
-        response = httpx.post(request_url, headers=self._headers, json=body)
+        response = self._client.post(request_url, **self._json_content(body))
         # Validate request response and parse
         self._raise_unexpected_response(response, 202, "item not copied")
         if verbose:
             print("Copy request sent.")
         if confirm_complete:
             monitor_url = response.headers.get("Location")
-            wait_duration = 1
-            previous_complete = 0
+            wait_duration = 1.0
+            previous_complete = 0.0
+            start_time = time.monotonic()
             while True:
                 if verbose:
                     print(f"Waiting {wait_duration:.0f}s before checking progress")
-                sleep(wait_duration)
-                response = httpx.get(monitor_url, follow_redirects=True)
-                response_data = response.json()
+                time.sleep(wait_duration)
+                response = self._request_without_auth(
+                    "GET", monitor_url, follow_redirects=True
+                )
+                # Report errors such as an expired monitor before reading the status
+                self._raise_unexpected_response(
+                    response, (200, 202), "item not copied", has_json=True
+                )
+                response_data = _json_loads(response.content)
                 if response_data["status"] == "completed":
                     if verbose:
                         print("Copy confirmed complete.")
                     break
-                percentage_complete = response_data["percentageComplete"]
+                if response_data["status"] == "failed":
+                    raise GraphAPIError("item not copied (copy operation failed)")
+                # Each status response is parsed once, the progress may be missing
+                # before the copy has started so no progress is assumed
+                percentage_complete = response_data.get(
+                    "percentageComplete", previous_complete
+                )
                 if verbose:
                     print(f"Percentage complete = {percentage_complete}%")
-                try:
+                # Estimate the time remaining from the progress rate
+                if percentage_complete > previous_complete:
+                    elapsed = time.monotonic() - start_time
                     wait_duration = (
-                        100.0
-                        / (percentage_complete - previous_complete)
-                        * wait_duration
-                        - wait_duration
+                        elapsed / percentage_complete * (100 - percentage_complete)
                     )
-                except ZeroDivisionError:
-                    wait_duration = 10
-                if wait_duration > 10:
-                    wait_duration = 10
-                elif wait_duration < 1:
-                    wait_duration = 1
+                else:
+                    # No progress since the last check, back off with jitter
+                    wait_duration = wait_duration * 1.5 + random.uniform(0, 0.25)
+                wait_duration = min(max(wait_duration, 1.0), 30.0)
+                # Never check sooner than instructed by the server
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    wait_duration = max(wait_duration, float(retry_after))
                 previous_complete = percentage_complete
             new_item_id = response_data["resourceId"]
             # Return the item id
@@ -996,20 +1653,72 @@ class OneDrive:
         if not isinstance(new_name, str):
             raise TypeError(f"new_name expected 'str', got {type(new_name).__name__!r}")
         # Create request url based on input item id that should be renamed
-        request_url = self._api_drive_url + "items/" + item_id
+        request_url = self._item_url(item_id)
         # Create the request body
         body = {"name": new_name}
         # Make the Graph API request
-        response = httpx.patch(request_url, headers=self._headers, json=body)
+        response = self._client.patch(request_url, **self._json_content(body))
         # Validate request response and parse
         self._raise_unexpected_response(
             response, 200, "item not renamed", has_json=True
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
+        self._cache_item_details(response_data)
         item_name = response_data["name"]
         # Return the item name
         return item_name
 
+    @token_required
+    def rename_items(
+        self, new_names: dict[str, str], max_connections: int = 8
+    ) -> list[str]:
+        """Renames multiple items (folders/files) using batched requests.
+        Positional arguments:
+            new_names ({str: str}) -- new item names with extension, keyed by the item id of the folder or file to rename
+        Keyword arguments:
+            max_connections (int) -- max concurrent open http requests, refer Docs regarding throttling limits (default = 8)
+        Returns:
+            item_names ([str]) -- new names of the folders or files that were renamed, in the same order as new_names
+        """
+        # Validate new_names
+        if not isinstance(new_names, dict):
+            raise TypeError(
+                f"new_names expected 'dict', got {type(new_names).__name__!r}"
+            )
+        for item_id, new_name in new_names.items():
+            if not isinstance(item_id, str):
+                raise TypeError(
+                    f"new_names expected 'str' keys, got {type(item_id).__name__!r} key"
+                )
+            if not isinstance(new_name, str):
+                raise TypeError(
+                    f"new_names expected 'str' values, got {type(new_name).__name__!r} value"
+                )
+        # Validate max_connections
+        if not isinstance(max_connections, int):
+            raise TypeError(
+                f"max_connections expected 'int', got {type(max_connections).__name__!r}"
+            )
+        # Make the Graph API requests in batches
+        requests = [
+            ("PATCH", self._item_url(item_id), {"name": new_name})
+            for item_id, new_name in new_names.items()
+        ]
+        responses = self._run_async(
+            self._batch_async(requests, max_connections), "rename_items"
+        )
+        # Validate request responses and parse
+        item_names = []
+        for response in responses:
+            self._raise_unexpected_response(
+                response, 200, "item not renamed", has_json=True
+            )
+            response_data = _json_loads(response.content)
+            self._cache_item_details(response_data)
+            item_names.append(response_data["name"])
+        # Return the item names
+        return item_names
+
     @token_required
     def delete_item(self, item_id: str, pre_confirm: bool = False) -> bool:
         """Deletes an item (folder/file) within the connected OneDrive. Potentially restorable in the OneDrive web browser client.
@@ -1026,7 +1735,7 @@ class OneDrive:
         # Validate pre_confirm
         if not isinstance(pre_confirm, bool):
             raise TypeError(
-                f"pre_confirm expected 'bool', got {type(item_id).__name__!r}"
+                f"pre_confirm expected 'bool', got {type(pre_confirm).__name__!r}"
             )
         # Get the user to confirm that they want to delete
         if not pre_confirm:
@@ -1039,11 +1748,69 @@ class OneDrive:
                 print("Aborted.")
                 return False
         # Create request url based on input item id that should be deleted
-        request_url = self._api_drive_url + "items/" + item_id
+        request_url = self._item_url(item_id)
         # Make the Graph API request
-        response = httpx.delete(request_url, headers=self._headers)
+        response = self._client.delete(request_url)
         # Validate request response
         self._raise_unexpected_response(response, 204, "item not deleted")
+        self._detail_cache.pop(item_id, None)
+        # Return confirmation of deletion
+        return True
+
+    @token_required
+    def delete_items(
+        self, item_ids: list[str], pre_confirm: bool = False, max_connections: int = 8
+    ) -> bool:
+        """Deletes multiple items (folders/files) using batched requests. Potentially restorable in the OneDrive web browser client.
+        Positional arguments:
+            item_ids ([str]) -- item ids of the folders or files to be deleted
+        Keyword arguments:
+            pre_confirm (bool) -- confirm that you want to delete the items and not show the warning (default = False)
+            max_connections (int) -- max concurrent open http requests, refer Docs regarding throttling limits (default = 8)
+        Returns:
+            confirmation (bool) -- True if all items were deleted successfully
+        """
+        # Validate item ids
+        if not isinstance(item_ids, list):
+            raise TypeError(
+                f"item_ids expected 'list', got {type(item_ids).__name__!r}"
+            )
+        for item_id in item_ids:
+            if not isinstance(item_id, str):
+                raise TypeError(
+                    f"item_ids expected list of 'str', got {type(item_id).__name__!r} item"
+                )
+        # Validate pre_confirm
+        if not isinstance(pre_confirm, bool):
+            raise TypeError(
+                f"pre_confirm expected 'bool', got {type(pre_confirm).__name__!r}"
+            )
+        # Validate max_connections
+        if not isinstance(max_connections, int):
+            raise TypeError(
+                f"max_connections expected 'int', got {type(max_connections).__name__!r}"
+            )
+        # Get the user to confirm that they want to delete
+        if not pre_confirm:
+            confirm = (
+                input(
+                    f"Deleted files may not be restorable. Type 'delete' to confirm deleting {len(item_ids)} items: "
+                )
+                .strip()
+                .lower()
+            )
+            if confirm != "delete":
+                print("Aborted.")
+                return False
+        # Make the Graph API requests in batches
+        requests = [("DELETE", self._item_url(item_id), None) for item_id in item_ids]
+        responses = self._run_async(
+            self._batch_async(requests, max_connections), "delete_items"
+        )
+        # Validate request responses
+        for item_id, response in zip(item_ids, responses):
+            self._raise_unexpected_response(response, 204, "item not deleted")
+            self._detail_cache.pop(item_id, None)
         # Return confirmation of deletion
         return True
 
@@ -1077,11 +1844,12 @@ class OneDrive:
         # Validate dest_dir
         if dest_dir is None:
             dest_dir = Path.cwd()
-        elif not isinstance(dest_dir, str) and not isinstance(dest_dir, Path):
+        elif not isinstance(dest_dir, (str, Path)):
             raise TypeError(
                 f"dest_dir expected 'str' or 'Path', got {type(dest_dir).__name__!r}"
             )
-        dest_dir = Path(dest_dir)
+        if not isinstance(dest_dir, Path):
+            dest_dir = Path(dest_dir)
         if dest_dir.is_dir() is False:
             raise ValueError(f"dest_dir {dest_dir} is not a directory")
         # Check max connections is not excessive
@@ -1090,8 +1858,13 @@ class OneDrive:
                 f"max_connections={max_connections} could result in throttling and enforced cool-down period",
                 stacklevel=2,
             )
-        # Get item details
-        file_details = self.detail_item(item_id)
+        # Get the item details required, always requested as the file may have changed since cached
+        request_url = self._item_url(item_id, "?$select=name,size,folder")
+        response = self._client.get(request_url)
+        self._raise_unexpected_response(
+            response, 200, "item could not be detailed", has_json=True
+        )
+        file_details = _json_loads(response.content)
         # Check that it is not a folder
         if "folder" in file_details:
             raise ValueError("item_id provided is for a folder, expected file item id")
@@ -1104,11 +1877,11 @@ class OneDrive:
             logger.warning(f"downloaded file size=0, empty file '{file_name}' created.")
             return file_name
         # Create request url based on input item id to be downloaded
-        request_url = self._api_drive_url + "items/" + item_id + "/content"
+        request_url = self._item_url(item_id, "/content")
         # Make the Graph API request
         if verbose:
             print("Getting the file download url")
-        response = httpx.get(request_url, headers=self._headers)
+        response = self._client.get(request_url)
         # Validate request response and parse
         self._raise_unexpected_response(response, 302, "could not get download url")
         download_url = response.headers["Location"]
@@ -1133,7 +1906,7 @@ class OneDrive:
         """INTERNAL: Creates a list of co-routines each downloading one part of the file, and starts them.
         Positional arguments:
             download_url (str) -- url of the file to download
-            file_path (Path) -- path of the final file
+            file_path (Path) -- path of the final file, only replaced once the download succeeds
             file_size (int) -- size of the file being downloaded
         Keyword arguments:
             max_connections (int) -- max concurrent open http requests
@@ -1145,109 +1918,166 @@ class OneDrive:
         assert isinstance(file_size, int)
         assert isinstance(max_connections, int)
         tasks = list()
-        file_part_names = list()
-        # This httpx.AsyncClient instance will be shared among the co-routines, passed as an argument
-        timeout = httpx.Timeout(10.0, read=180.0)
-        client = httpx.AsyncClient(timeout=timeout)
-        # Creates a new temp directory via tempfile.TemporaryDirectory()
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            # Min chunk size, used to calculate the  number of concurrent connections based on file size
-            min_typ_chunk_size = 1 * 1024 * 1024  # 1 MiB
-            # Effective number of concurrent connections
-            num_coroutines = file_size // (2 * min_typ_chunk_size) + 1
-            # Assures the max number of co-routines/concurrent connections is equal to the provided one
-            if num_coroutines > max_connections:
-                num_coroutines = max_connections
-            # Calculates the final size of the chunk that each co-routine will download
-            typ_chunk_size = file_size // num_coroutines
-            if verbose:
-                pretty_size = round(file_size / 1000000, 1)
-                print(
-                    f"File {file_path.name} ({pretty_size}mb) will be downloaded in {num_coroutines} segments."
-                )
-            logger.debug(
-                f"file_size={file_size}B, min_typ_chunk_size={min_typ_chunk_size}B, num_coroutines={num_coroutines}, typ_chunk_size={typ_chunk_size}"
+        # Min chunk size, used to calculate the  number of concurrent connections based on file size
+        min_typ_chunk_size = 1 * 1024 * 1024  # 1 MiB
+        # Effective number of concurrent connections
+        num_coroutines = file_size // (2 * min_typ_chunk_size) + 1
+        # Assures the max number of co-routines/concurrent connections is equal to the provided one
+        if num_coroutines > max_connections:
+            num_coroutines = max_connections
+        # Calculates the final size of the chunk that each co-routine will download
+        typ_chunk_size = file_size // num_coroutines
+        if verbose:
+            pretty_size = round(file_size / 1000000, 1)
+            print(
+                f"File {file_path.name} ({pretty_size}mb) will be downloaded in {num_coroutines} segments."
             )
-            for i in range(num_coroutines):
-                # Get the file part Path, placed in the temp directory
-                part_file_path = Path(tmp_dir).joinpath(
-                    file_path.name + "." + str(i + 1)
-                )
-                # We save the file part Path for later use
-                file_part_names.append(part_file_path)
-                # On first iteration will be 0
-                start = typ_chunk_size * i
-                # If this is the last part, the `end` will be set to the file size minus one
-                # This is needed to be sure we download the entire file.
-                if i == num_coroutines - 1:
-                    end = file_size - 1
-                else:
-                    end = start + typ_chunk_size - 1
-                # We create a task and append it to the `task` list.
-                tasks.append(
-                    asyncio.create_task(
-                        self._download_async_part(
-                            client, download_url, part_file_path, start, end, verbose
-                        )
+        logger.debug(
+            f"file_size={file_size}B, min_typ_chunk_size={min_typ_chunk_size}B, num_coroutines={num_coroutines}, typ_chunk_size={typ_chunk_size}"
+        )
+        # Pre-allocate a temporary file next to the final file so each co-routine can write
+        # its part in place, an existing local copy is only replaced once all parts succeed
+        temp_fd, temp_name = tempfile.mkstemp(
+            dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".part"
+        )
+        temp_path = Path(temp_name)
+        try:
+            with open(temp_fd, "wb") as fw:
+                # Keep the permissions of an existing file, otherwise those of a new file
+                try:
+                    mode = stat.S_IMODE(os.stat(file_path).st_mode)
+                except FileNotFoundError:
+                    mode = 0o666 & ~_UMASK
+                os.chmod(temp_path, mode)
+                fw.truncate(file_size)
+                # Reserve the disk blocks up front where supported so a full disk fails
+                # before any data is downloaded rather than part way through a write
+                if file_size > 0 and hasattr(os, "posix_fallocate"):
+                    try:
+                        os.posix_fallocate(fw.fileno(), 0, file_size)
+                    except OSError as e:
+                        if e.errno == errno.ENOSPC:
+                            raise
+                        # Not all filesystems support it, the sparse file is still usable
+        except BaseException:
+            # Remove the temporary file, e.g. when the disk is full
+            temp_path.unlink()
+            raise
+        # This httpx.AsyncClient instance will be shared among the co-routines, passed as an argument.
+        # It is created once the file is allocated so a failed allocation leaves nothing to close
+        client = self._async_client(
+            timeout=self._TRANSFER_TIMEOUT, max_connections=num_coroutines
+        )
+        for i in range(num_coroutines):
+            # On first iteration will be 0
+            start = typ_chunk_size * i
+            # If this is the last part, the `end` will be set to the file size minus one
+            # This is needed to be sure we download the entire file.
+            if i == num_coroutines - 1:
+                end = file_size - 1
+            else:
+                end = start + typ_chunk_size - 1
+            # We create a task and append it to the `task` list.
+            tasks.append(
+                asyncio.create_task(
+                    self._download_async_part(
+                        client, download_url, temp_path, start, end, i + 1, verbose
                     )
                 )
+            )
+        try:
             # This awaits all the tasks in the `task` list to return
             await asyncio.gather(*tasks)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            # Cancel any remaining parts and remove the incomplete temporary file
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            temp_path.unlink()
+            raise
+        finally:
             # Closing the httpx.AsyncClient instance
             await client.aclose()
-            # Join the downloaded file parts
-            if verbose:
-                print("Joining individual segments into single file")
-            with open(file_path, "wb") as fw:
-                for file_part in file_part_names:
-                    with open(file_part, "rb") as fr:
-                        shutil.copyfileobj(fr, fw)
-                    file_part.unlink()
 
     async def _download_async_part(
         self,
         client: httpx.AsyncClient,
         download_url: str,
-        part_file_path: Path,
+        file_path: Path,
         start: int,
         end: int,
+        part_number: int,
         verbose: bool = False,
     ) -> None:
-        """INTERNAL: Co-routine to download a part of a file asynchronously.
+        """INTERNAL: Co-routine to download a part of a file asynchronously, writing it in place.
         Positional arguments:
             client (httpx) -- client object to use to make request
             download_url (str) -- url of the file to download
-            part_file_path (str) -- path to the temporary part file
+            file_path (Path) -- path of the pre-allocated temporary file
             start (int) -- byte range to start the download at
             end (int) -- byte range to end the download at
+            part_number (int) -- number of the segment, used for status messages
         Keyword arguments:
             verbose (bool) -- prints status message during the download process (default = False)
         """
-        # Each co-routine opens its own file part to write into
-        async with aiofiles.open(part_file_path, "wb") as fw:
-            # Build the Range HTTP header and add the auth header
+        # Each co-routine opens its own handle to the final file to write into,
+        # file operations run in a worker thread so the event loop is not blocked
+        fw = await asyncio.to_thread(open, file_path, "r+b")
+        with fw:
+            # Scale the write size with the segment so large segments make fewer writes,
+            # while small segments do not allocate more than they receive
+            length = end - start + 1
+            buffer_size = min(max(length // 64, 1024 * 1024), 4 * 1024**2, length)
+            # The client sends the instance headers, only the Range HTTP header is added
             headers = {"Range": f"bytes={start}-{end}"}
-            headers.update(self._headers)
-            part_name = part_file_path.suffix.lstrip(".")
             if verbose:
                 print(
-                    f"Starting download of file segment {part_name} (bytes {start}-{end})"
+                    f"Starting download of file segment {part_number} (bytes {start}-{end})"
                 )
             logger.debug(
-                f"starting download segment={part_name} start={start} end={end}"
+                f"starting download segment={part_number} start={start} end={end}"
             )
-            # Create an AsyncIterator over our GET request
+            # Create an AsyncIterator over our GET request, throttled requests are retried by the client transport
             async with client.stream("GET", download_url, headers=headers) as response:
-                # Iterates over incoming bytes in chunks and saves them to file
+                # Iterates over incoming bytes in chunks and saves them at the segment offset
                 self._raise_unexpected_response(
-                    response, [200, 206], "item not downloaded"
+                    response, (200, 206), "item not downloaded"
                 )
-                write_chunk_size = 64 * 1024  # 64 KiB
-                async for chunk in response.aiter_bytes(write_chunk_size):
-                    await fw.write(chunk)
+                fw.seek(start)
+                await self._write_response(response, fw, buffer_size)
             if verbose:
-                print(f"Finished download of file segment {part_name}")
-            logger.debug(f"finished download segment={part_name}")
+                print(f"Finished download of file segment {part_number}")
+            logger.debug(f"finished download segment={part_number}")
+
+    @staticmethod
+    async def _write_response(
+        response: httpx.Response, file: Any, buffer_size: int = 1024 * 1024
+    ) -> None:
+        """INTERNAL: Writes a streamed response body to a file, collecting the received chunks in one reused buffer.
+        Each write is handed to a worker thread, so fewer larger writes are made without allocating per write.
+        Positional arguments:
+            response (Response) -- HTTPX streamed response object
+            file (BufferedRandom) -- binary file object to write to at its current position
+        Keyword arguments:
+            buffer_size (int) -- bytes to collect before each write (default = 1 MiB)
+        """
+        buffer = memoryview(bytearray(buffer_size))
+        filled = 0
+        async for chunk in response.aiter_bytes():
+            chunk_view = memoryview(chunk)
+            while chunk_view:
+                # Copy as much of the chunk as fits into the buffer
+                n = min(len(chunk_view), buffer_size - filled)
+                buffer[filled : filled + n] = chunk_view[:n]
+                filled += n
+                chunk_view = chunk_view[n:]
+                # Write the buffer once full, the write is awaited before the buffer is reused
+                if filled == buffer_size:
+                    await asyncio.to_thread(file.write, buffer)
+                    filled = 0
+        if filled:
+            await asyncio.to_thread(file.write, buffer[:filled])
 
     @token_required
     def upload_file(
@@ -1257,6 +2087,9 @@ class OneDrive:
         parent_folder_id: str | None = None,
         if_exists: str = "rename",
         verbose: bool = False,
+        chunk_size: int | None = None,
+        compress: str | None = None,
+        keep_timestamps: bool = True,
     ) -> str:
         """Uploads a file to a particular folder with a provided file name.
         Positional arguments:
@@ -1266,11 +2099,14 @@ class OneDrive:
             parent_folder_id (str) -- item id of the folder to put the file within, if None then root (default = None)
             if_exists (str) -- action to take if the new folder already exists [fail, replace, rename] (default = "rename")
             verbose (bool) -- prints status message during the download process (default = False)
+            chunk_size (int) -- bytes sent per upload request, a multiple of 320KiB less than 60MiB, if None then adapted to the upload speed (default = None)
+            compress (str) -- compress the file before uploading and add the extension to the name [gzip, zstd], if None then uploaded as is (default = None)
+            keep_timestamps (bool) -- keep the local file created and modified dates, if False files up to 4MiB are uploaded in a single request (default = True)
         Returns:
             item_id (str) -- item id of the newly uploaded file
         """
         # Validate file_path
-        if not isinstance(file_path, str) and not isinstance(file_path, Path):
+        if not isinstance(file_path, (str, Path)):
             raise TypeError(
                 f"file_path expected 'str' or 'Path', got {type(file_path).__name__!r}"
             )
@@ -1290,42 +2126,306 @@ class OneDrive:
             raise ValueError(
                 f"if_exists expected 'fail', 'replace', or 'rename', got {if_exists!r}"
             )
-        # Clean file path by removing escape slashes and converting to Path object
-        # To-do: avoid the pathlib as it is a resource hog
-        if os.name == "nt":  # Windows
-            file_path = str(file_path).replace("/", "")
-        else:  # Other systems including Mac, Linux
-            file_path = str(file_path).replace("\\", "")
-        file_path = Path(file_path)
+        # Validate chunk_size
+        if chunk_size is None:
+            pass
+        elif not isinstance(chunk_size, int):
+            raise TypeError(
+                f"chunk_size expected 'int', got {type(chunk_size).__name__!r}"
+            )
+        elif (
+            chunk_size <= 0
+            or chunk_size % self._UPLOAD_CHUNK_MULTIPLE
+            or chunk_size >= self._UPLOAD_CHUNK_MAX
+        ):
+            raise ValueError(
+                f"chunk_size expected a multiple of 320KiB less than 60MiB, got {chunk_size}"
+            )
+        # Validate compress
+        if compress is not None and compress not in self._COMPRESS_EXTS:
+            raise ValueError(f"compress expected 'gzip' or 'zstd', got {compress!r}")
+        if compress == "zstd" and not optionals_zstd:
+            raise ValueError(
+                "compress was 'zstd' but zstandard is not installed, Hint: 'pip install zstandard'"
+            )
+        # Clean file path, the Path is only created once and the file is stat once for its metadata
+        file_path = self._clean_file_path(file_path)
         logger.debug(f"file_path={file_path}")
         # Set file name
         if new_file_name:
             destination_file_name = new_file_name
         else:
             destination_file_name = file_path.name
-        # Check the path is valid and points to a file
-        if not os.path.isfile(file_path):
-            raise ValueError(
-                f"file_path expected a path to an existing file, got '{file_path!s}'"
-            )
-        # Get file metadata
+        # Get file metadata, this also checks the path points to an existing file
         file_size, file_created, file_modified = self._get_local_file_metadata(
             file_path
         )
+        # Upload a compressed copy instead if requested, the copy is removed afterwards
+        if compress:
+            if verbose:
+                print(f"Compressing file with {compress}")
+            with tempfile.TemporaryDirectory() as temp_dir:
+                compressed_path = self._compress_file(file_path, compress, temp_dir)
+                return self.upload_file(
+                    compressed_path,
+                    destination_file_name + self._COMPRESS_EXTS[compress],
+                    parent_folder_id,
+                    if_exists,
+                    verbose,
+                    chunk_size,
+                    keep_timestamps=keep_timestamps,
+                )
+        # Small files can be uploaded in one request, but this cannot set the dates
+        if not keep_timestamps and file_size <= self._SIMPLE_UPLOAD_MAX:
+            return self._upload_simple(
+                file_path,
+                destination_file_name,
+                parent_folder_id,
+                conflict_behavior,
+                verbose,
+            )
+        # Create request url and body for the upload session
+        request_url, body = self._upload_session_request(
+            destination_file_name,
+            parent_folder_id,
+            conflict_behavior,
+            file_created,
+            file_modified,
+        )
+        # Make the Graph API request for the upload session
+        if verbose:
+            print("Requesting upload session")
+        response = self._client.post(request_url, **self._json_content(body))
+        # Validate upload session request response and parse
+        self._raise_unexpected_response(
+            response, 200, "upload session could not be created", has_json=True
+        )
+        upload_url = _json_loads(response.content)["uploadUrl"]
+        logger.debug(f"upload_url={upload_url}")
+        # Determine the number of upload segments, unknown if the size is adaptive
+        if chunk_size is not None:
+            no_of_uploads = -(-file_size // chunk_size)
+            logger.debug(
+                f"chunk_size={chunk_size}B, file_size={file_size}, no_of_uploads={no_of_uploads}"
+            )
+            if verbose and no_of_uploads > 1:
+                print(
+                    f"File {destination_file_name} will be uploaded in {no_of_uploads} segments"
+                )
+            logger.info(
+                f"file {destination_file_name} will be uploaded in {no_of_uploads} segments"
+            )
+        # Run in a try block to capture user cancellation request
+        try:
+            response = asyncio.run(
+                self._upload_async(
+                    upload_url, file_path, file_size, chunk_size, verbose
+                )
+            )
+        except KeyboardInterrupt:
+            self._request_without_auth("DELETE", upload_url)
+            if verbose:
+                print("Upload cancelled by user.")
+            raise
+        except Exception:
+            self._request_without_auth("DELETE", upload_url)
+            raise
+        if verbose:
+            print("Upload complete")
+        # Return the file item id
+        response_data = _json_loads(response.content)
+        self._cache_item_details(response_data)
+        item_id = response_data["id"]
+        return item_id
+
+    @token_required
+    def upload_files(
+        self,
+        file_paths: list[str | Path],
+        parent_folder_id: str | None = None,
+        if_exists: str = "rename",
+        max_connections: int = 4,
+        verbose: bool = False,
+        keep_timestamps: bool = True,
+    ) -> list[str]:
+        """Uploads multiple files to a particular folder, several files at a time.
+        The upload sessions are created with batched requests, small files may instead be uploaded in single requests like upload_file.
+        Positional arguments:
+            file_paths ([str|Path]) -- paths of the local source files to upload
+        Keyword arguments:
+            parent_folder_id (str) -- item id of the folder to put the files within, if None then root (default = None)
+            if_exists (str) -- action to take if a file already exists [fail, replace, rename] (default = "rename")
+            max_connections (int) -- max files uploaded at once, refer Docs regarding throttling limits (default = 4)
+            verbose (bool) -- prints status message during the upload process (default = False)
+            keep_timestamps (bool) -- keep the local file created and modified dates, if False files up to 4MiB are uploaded in a single request (default = True)
+        Returns:
+            item_ids ([str]) -- item ids of the newly uploaded files, in the same order as file_paths
+        """
+        # Validate file_paths
+        if not isinstance(file_paths, list):
+            raise TypeError(
+                f"file_paths expected 'list', got {type(file_paths).__name__!r}"
+            )
+        for file_path in file_paths:
+            if not isinstance(file_path, (str, Path)):
+                raise TypeError(
+                    f"file_paths expected list of 'str' or 'Path', got {type(file_path).__name__!r} item"
+                )
+        # Validate parent_folder_id
+        if parent_folder_id and not isinstance(parent_folder_id, str):
+            raise TypeError(
+                f"parent_folder_id expected 'str', got {type(parent_folder_id).__name__!r}"
+            )
+        # Set conflict behavior
+        conflict_behavior = if_exists
+        if conflict_behavior not in ("fail", "replace", "rename"):
+            raise ValueError(
+                f"if_exists expected 'fail', 'replace', or 'rename', got {if_exists!r}"
+            )
+        # Validate max_connections
+        if not isinstance(max_connections, int):
+            raise TypeError(
+                f"max_connections expected 'int', got {type(max_connections).__name__!r}"
+            )
+        # Get the metadata of every file first so a missing file fails before uploading
+        files = []
+        simple_files = []
+        # Position of each file in file_paths, so the item ids are returned in order
+        session_indexes = []
+        requests: list[tuple[str, str, dict[str, Any] | None]] = []
+        for index, file_path in enumerate(file_paths):
+            file_path = self._clean_file_path(file_path)
+            file_size, file_created, file_modified = self._get_local_file_metadata(
+                file_path
+            )
+            # Small files can be uploaded in one request, but this cannot set the dates
+            if not keep_timestamps and file_size <= self._SIMPLE_UPLOAD_MAX:
+                simple_files.append((index, file_path))
+                continue
+            files.append((file_path, file_size))
+            session_indexes.append(index)
+            request_url, body = self._upload_session_request(
+                file_path.name,
+                parent_folder_id,
+                conflict_behavior,
+                file_created,
+                file_modified,
+            )
+            requests.append(("POST", request_url, body))
+        item_ids = [""] * len(file_paths)
+        if files:
+            # Make the Graph API requests for the upload sessions in batches
+            if verbose:
+                print(f"Requesting {len(files)} upload sessions")
+            responses = self._run_async(self._batch_async(requests), "upload_files")
+            # Collect the created sessions first so all of them are cancelled on failure
+            upload_urls = [
+                _json_loads(response.content)["uploadUrl"]
+                for response in responses
+                if response.status_code == 200
+            ]
+            # Run in a try block to also capture user cancellation request
+            try:
+                for response in responses:
+                    self._raise_unexpected_response(
+                        response,
+                        200,
+                        "upload session could not be created",
+                        has_json=True,
+                    )
+                responses = self._run_async(
+                    self._upload_many_async(
+                        files, upload_urls, max_connections, verbose
+                    ),
+                    "upload_files",
+                )
+            except BaseException:
+                # Sessions of completed uploads no longer exist, deleting them has no effect
+                for upload_url in upload_urls:
+                    self._request_without_auth("DELETE", upload_url)
+                raise
+            # Collect the item ids in the order of the file paths
+            for index, response in zip(session_indexes, responses):
+                response_data = _json_loads(response.content)
+                self._cache_item_details(response_data)
+                item_ids[index] = response_data["id"]
+        # Upload the small files, each in a single request
+        for index, file_path in simple_files:
+            item_ids[index] = self._upload_simple(
+                file_path, file_path.name, parent_folder_id, conflict_behavior, verbose
+            )
+        if verbose:
+            print("Uploads complete")
+        # Return the file item ids
+        return item_ids
+
+    async def _upload_many_async(
+        self,
+        files: list[tuple[Path, int]],
+        upload_urls: list[str],
+        max_connections: int = 4,
+        verbose: bool = False,
+    ) -> list[httpx.Response]:
+        """INTERNAL: Uploads files to their upload sessions concurrently.
+        Positional arguments:
+            files ([(Path, int)]) -- path and size of each local source file to upload
+            upload_urls ([str]) -- pre-authenticated url of the upload session of each file
+        Keyword arguments:
+            max_connections (int) -- max files uploaded at once (default = 4)
+            verbose (bool) -- prints status message during the upload process (default = False)
+        Returns:
+            responses ([Response]) -- HTTPX response object of the final segment of each file, in the same order as files
+        """
+        # Limit the number of files uploading at once
+        semaphore = asyncio.Semaphore(max_connections)
+
+        async def upload(
+            file_path: Path, file_size: int, upload_url: str
+        ) -> httpx.Response:
+            async with semaphore:
+                if verbose:
+                    print(f"Uploading {file_path.name}")
+                return await self._upload_async(
+                    upload_url, file_path, file_size, None, verbose
+                )
+
+        return await asyncio.gather(
+            *(
+                upload(file_path, file_size, upload_url)
+                for (file_path, file_size), upload_url in zip(files, upload_urls)
+            )
+        )
+
+    def _upload_session_request(
+        self,
+        file_name: str,
+        parent_folder_id: str | None,
+        conflict_behavior: str,
+        file_created: str,
+        file_modified: str,
+    ) -> tuple[str, dict[str, Any]]:
+        """INTERNAL: Creates the url and body of an upload session request, keeping the local file dates.
+        Positional arguments:
+            file_name (str) -- name of the file as it should appear on OneDrive
+            parent_folder_id (str) -- item id of the folder to put the file within, if None then root
+            conflict_behavior (str) -- action to take if the file already exists [fail, replace, rename]
+            file_created (str) -- UTC ISO format file creation timestamp
+            file_modified (str) -- UTC ISO format file last modified timestamp
+        Returns:
+            request_url (str) -- url of the upload session request
+            body (dict) -- body of the upload session request
+        """
         # Create request url for the upload session
-        if parent_folder_id:
-            request_url = self._api_drive_url + "items/" + parent_folder_id + ":/"
-        else:
-            request_url = self._api_drive_url + "root:/"
-        request_url += (
-            urllib.parse.quote(destination_file_name) + ":/createUploadSession"
+        file_name_quoted = urllib.parse.quote(file_name)
+        request_url = self._item_url(
+            parent_folder_id, f":/{file_name_quoted}:/createUploadSession"
         )
         logger.debug(f"upload session request_url={request_url}")
         # Create request body for the upload session
         body = {
             "item": {
                 "@microsoft.graph.conflictBehavior": conflict_behavior,
-                "name": destination_file_name,
+                "name": file_name,
                 "fileSystemInfo": {
                     "createdDateTime": file_created,
                     "lastModifiedDateTime": file_modified,
@@ -1333,111 +2433,292 @@ class OneDrive:
             }
         }
         logger.debug(f"upload session body={body}")
-        # Make the Graph API request for the upload session
+        return request_url, body
+
+    def _upload_simple(
+        self,
+        file_path: Path,
+        file_name: str,
+        parent_folder_id: str | None,
+        conflict_behavior: str,
+        verbose: bool = False,
+    ) -> str:
+        """INTERNAL: Uploads a small file with a single request instead of an upload session.
+        Positional arguments:
+            file_path (Path) -- path of the local source file to upload, up to 4MiB
+            file_name (str) -- name of the file as it should appear on OneDrive
+            parent_folder_id (str) -- item id of the folder to put the file within, if None then root
+            conflict_behavior (str) -- action to take if the file already exists [fail, replace, rename]
+        Keyword arguments:
+            verbose (bool) -- prints status message during the upload process (default = False)
+        Returns:
+            item_id (str) -- item id of the newly uploaded file
+        """
+        file_name_quoted = urllib.parse.quote(file_name)
+        request_url = self._item_url(parent_folder_id, f":/{file_name_quoted}:/content")
+        params = {"@microsoft.graph.conflictBehavior": conflict_behavior}
         if verbose:
-            print(f"Requesting upload session")
-        response = httpx.post(request_url, headers=self._headers, json=body)
-        # Validate upload session request response and parse
-        self._raise_unexpected_response(
-            response, 200, "upload session could not be created", has_json=True
+            print(f"Uploading {file_name} in a single request")
+        with open(file_path, "rb") as file:
+            content = file.read()
+        response = self._client.put(
+            request_url,
+            params=params,
+            content=content,
+            timeout=self._TRANSFER_TIMEOUT,
         )
-        upload_url = response.json()["uploadUrl"]
-        logger.debug(f"upload_url={upload_url}")
-        # Determine the upload file chunk size
-        chunk_size: int = (
-            1024 * 320 * 16
-        )  # = 5MiB. Docs: Must be multiple of 320KiB, recommend 5-10MiB, max 60MiB
-        no_of_uploads: int = -(-file_size // chunk_size)
-        logger.debug(
-            f"chunk_size={chunk_size}B, file_size={file_size}, no_of_uploads={no_of_uploads}"
-        )
-        if verbose and no_of_uploads > 1:
-            print(
-                f"File {destination_file_name} will be uploaded in {no_of_uploads} segments"
-            )
-        logger.info(
-            f"file {destination_file_name} will be uploaded in {no_of_uploads} segments"
+        self._raise_unexpected_response(
+            response, (200, 201), "item not uploaded", has_json=True
         )
-        # Create an upload connection client
-        timeout = httpx.Timeout(10.0, read=180.0, write=180.0)
-        client = httpx.Client(timeout=timeout)
-        # Run in a try block to capture user cancellation request
-        try:
-            # Open the file pointer
+        if verbose:
+            print("Upload complete")
+        response_data = _json_loads(response.content)
+        self._cache_item_details(response_data)
+        item_id = response_data["id"]
+        return item_id
+
+    async def _upload_async(
+        self,
+        upload_url: str,
+        file_path: Path,
+        file_size: int,
+        chunk_size: int | None,
+        verbose: bool = False,
+    ) -> httpx.Response:
+        """INTERNAL: Uploads a file to an upload session one segment at a time, streaming each segment from the file.
+        Positional arguments:
+            upload_url (str) -- pre-authenticated url of the upload session
+            file_path (Path) -- path of the local source file to upload
+            file_size (int) -- size of the file being uploaded
+            chunk_size (int) -- bytes sent per upload request, if None then adapted to the upload speed
+        Keyword arguments:
+            verbose (bool) -- prints status message during the upload process (default = False)
+        Returns:
+            response (Response) -- HTTPX response object of the final segment, validated as the created item
+        """
+        # Assert rather then check as this is an internal method
+        assert isinstance(upload_url, str)
+        assert isinstance(file_path, Path)
+        assert isinstance(file_size, int)
+        assert chunk_size is None or isinstance(chunk_size, int)
+        # A fixed size gives a known number of segments, otherwise the size adapts
+        if chunk_size is None:
+            segment_size = self._UPLOAD_CHUNK_START
+            no_of_uploads = None
+        else:
+            segment_size = chunk_size
+            no_of_uploads = -(-file_size // chunk_size)
+        # Create an upload connection client. Socket options are left as they are,
+        # httpcore already sets TCP_NODELAY and setting SO_SNDBUF would stop the
+        # kernel from auto-tuning the send buffer, capping throughput on fast links
+        async with httpx.AsyncClient(
+            timeout=self._TRANSFER_TIMEOUT, http2=optionals_http2
+        ) as client:
+            # Segments are read and uploaded one at a time so the file is never fully loaded.
+            # Upload sessions reject segments sent out of order, so they are not sent
+            # concurrently, the kernel read ahead overlaps the sequential reads instead
             if verbose:
                 print("Loading file")
             logger.info(f"opening file '{file_path}'")
-            data = open(file_path, "rb")
-            # Start the upload in a loop for as long as there is data left to upload
-            n = 0
-            while data.tell() < file_size:
-                # Print the upload status
-                n += 1
-                if n == 1:
-                    content_range_start = 0
-                    content_range_end = chunk_size - 1
-                    if verbose:
-                        print(f"Uploading segment {n}/{no_of_uploads}")
-                else:
-                    if verbose:
-                        print(
-                            f"Uploading segment {n}/{no_of_uploads} (~{int((n-1)/no_of_uploads*100)}% complete)"
+            async with contextlib.AsyncExitStack() as stack:
+                if file_size >= self._UPLOAD_MMAP_MIN_SIZE:
+                    # Large files are memory mapped so segments are sent without copies
+                    with open(file_path, "rb") as file:
+                        data: Any = stack.enter_context(
+                            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
                         )
-                logger.debug(
-                    f"uploading file segment={n}, content_range_start={content_range_start}, content_range_end={content_range_end}"
-                )
-                # Upload chunks
-                if (file_size - data.tell()) > chunk_size:
-                    # Typical chunk upload
-                    headers = {
-                        "Content-Range": f"bytes {content_range_start}-{content_range_end}/{file_size}"
-                    }
-                    content = data.read(chunk_size)
-                    response = client.put(
-                        upload_url,
-                        headers=headers,
-                        content=content,
+                    # The mapping is read once from start to end, so ask the kernel to
+                    # read ahead aggressively where supported (not on Windows)
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        data.madvise(mmap.MADV_SEQUENTIAL)
+                else:
+                    data = stack.enter_context(
+                        await asyncio.to_thread(open, file_path, "rb")
                     )
-                    # Validate request response
-                    self._raise_unexpected_response(
-                        response, 202, f"could not upload chuck {n} of {no_of_uploads}"
+                n = 0
+                content_range_start = 0
+                while True:
+                    n += 1
+                    # Calculate the chunk range, the final chunk may be smaller
+                    content_range_end = (
+                        min(content_range_start + segment_size, file_size) - 1
                     )
-                    # Calculate next chunk range
-                    content_range_start = data.tell()
-                    content_range_end = data.tell() + chunk_size - 1
-                else:
-                    # Final chunk upload
-                    content_range_end = file_size - 1
-                    headers = {
-                        "Content-Range": f"bytes {content_range_start}-{content_range_end}/{file_size}"
-                    }
-                    content = data.read(chunk_size)
-                    response = client.put(
+                    final_segment = content_range_end >= file_size - 1
+                    # Report the upload status, the progress is based on the bytes sent
+                    status = f"segment {n}"
+                    if no_of_uploads is not None:
+                        status += f"/{no_of_uploads}"
+                    if n > 1:
+                        status += (
+                            f" (~{content_range_start * 100 // file_size}% complete)"
+                        )
+                    logger.info(f"uploading {status}")
+                    if verbose:
+                        print(f"Uploading {status}")
+                    logger.debug(
+                        f"uploading file segment={n}, content_range_start={content_range_start}, content_range_end={content_range_end}"
+                    )
+                    # Upload chunk
+                    started = time.monotonic()
+                    response = await self._upload_chunk(
+                        client,
                         upload_url,
-                        headers=headers,
-                        content=content,
+                        data,
+                        content_range_start,
+                        content_range_end,
+                        file_size,
                     )
-        except KeyboardInterrupt:
-            httpx.delete(upload_url)
-            if verbose:
-                print("Upload cancelled by user.")
-            raise
-        except Exception:
-            httpx.delete(upload_url)
-            raise
-        finally:
-            data.close()
-            client.close()
-        # Validate request response
-        self._raise_unexpected_response(
-            response, [200, 201], "item not uploaded", has_json=True
-        )
-        if verbose:
-            print("Upload complete")
-        # Return the file item id
-        response_data = response.json()
-        item_id = response_data["id"]
-        return item_id
+                    # Validate each response as it arrives so a failure stops the upload
+                    if final_segment:
+                        self._raise_unexpected_response(
+                            response, (200, 201), "item not uploaded", has_json=True
+                        )
+                        break
+                    message = f"could not upload chuck {n}"
+                    if no_of_uploads is not None:
+                        message += f" of {no_of_uploads}"
+                    self._raise_unexpected_response(response, 202, message)
+                    if chunk_size is None:
+                        segment_size = self._adapt_chunk_size(
+                            segment_size, time.monotonic() - started
+                        )
+                    content_range_start = content_range_end + 1
+        return response
+
+    def _adapt_chunk_size(self, chunk_size: int, elapsed: float) -> int:
+        """INTERNAL: Adjusts the upload segment size from the time the previous segment took.
+        Quick segments double the size up to the maximum, slow or retried segments halve it.
+        Positional arguments:
+            chunk_size (int) -- size of the previous segment, a multiple of 320KiB
+            elapsed (float) -- seconds the previous segment took, including any retries
+        Returns:
+            chunk_size (int) -- size of the next segment, a multiple of 320KiB
+        """
+        if elapsed < self._UPLOAD_TARGET_SECONDS:
+            return min(chunk_size * 2, self._UPLOAD_CHUNK_SIZE)
+        if elapsed > 4 * self._UPLOAD_TARGET_SECONDS:
+            half = chunk_size // 2
+            half -= half % self._UPLOAD_CHUNK_MULTIPLE
+            return max(half, self._UPLOAD_CHUNK_MULTIPLE)
+        return chunk_size
+
+    async def _upload_chunk(
+        self,
+        client: httpx.AsyncClient,
+        upload_url: str,
+        file: Any,
+        start: int,
+        end: int,
+        file_size: int,
+    ) -> httpx.Response:
+        """INTERNAL: Uploads one file segment to an upload session, retrying if throttled or on server errors.
+        The segment is streamed from the file rather than read into memory, so it is read again for each attempt.
+        Positional arguments:
+            client (httpx.AsyncClient) -- client object to use to make request
+            upload_url (str) -- pre-authenticated url of the upload session
+            file (BufferedReader|mmap) -- binary file object or memory mapped file to read the segment from
+            start (int) -- byte range to start the segment at
+            end (int) -- byte range to end the segment at
+            file_size (int) -- size of the file being uploaded
+        Returns:
+            response (Response) -- HTTPX response object of the last attempt
+        """
+        # The headers are built once per segment and reused by any retries,
+        # the length is set explicitly so the streamed segment is not sent chunked
+        length = end - start + 1
+        headers = {
+            "Content-Length": str(length),
+            "Content-Range": f"bytes {start}-{end}/{file_size}",
+        }
+        attempt = 0
+        while True:
+            response = await client.put(
+                upload_url,
+                headers=headers,
+                content=self._read_segment(file, start, length),
+            )
+            if (
+                response.status_code not in self._UPLOAD_RETRY_STATUS_CODES
+                or attempt >= self._RETRY_MAX_ATTEMPTS
+            ):
+                return response
+            delay = self._retry_delay(response, attempt)
+            logger.warning(
+                f"upload segment returned status={response.status_code}, retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    async def _read_segment(
+        file: Any, start: int, length: int, buffer_size: int = 1024 * 1024
+    ) -> AsyncIterator[bytes]:
+        """INTERNAL: Yields a byte range of a file in pieces, so only one piece is held in memory at a time.
+        Memory mapped files yield views of the mapping, other files are read into one reused buffer.
+        Each piece must be consumed before the next is requested, as the buffer is then overwritten.
+        The pieces are memoryviews typed as bytes, httpx sends any buffer-protocol object without copying.
+        Positional arguments:
+            file (BufferedReader|mmap) -- binary file object or memory mapped file to read from
+            start (int) -- byte position to start reading at
+            length (int) -- number of bytes to read
+        Keyword arguments:
+            buffer_size (int) -- bytes to read per piece (default = 1 MiB)
+        Returns:
+            pieces (async iterator) -- async iterator of the pieces of the byte range
+        """
+        if isinstance(file, mmap.mmap):
+            end = start + length
+            with memoryview(file) as view:
+                for offset in range(start, end, buffer_size):
+                    yield cast(bytes, view[offset : min(offset + buffer_size, end)])
+            return
+        # Seeking does not read, only the reads run in a worker thread
+        file.seek(start)
+        buffer = memoryview(bytearray(min(buffer_size, length)))
+        remaining = length
+        while remaining > 0:
+            n = await asyncio.to_thread(
+                file.readinto, buffer[: min(buffer_size, remaining)]
+            )
+            if not n:
+                break
+            remaining -= n
+            yield cast(bytes, buffer[:n])
+
+    def _compress_file(self, file_path: Path, compress: str, dest_dir: str) -> Path:
+        """INTERNAL: Compresses a file into a directory, keeping the source file timestamps.
+        Positional arguments:
+            file_path (Path) -- path of the local source file to compress
+            compress (str) -- compression format [gzip, zstd]
+            dest_dir (str) -- directory to create the compressed file in
+        Returns:
+            compressed_path (Path) -- path of the compressed file
+        """
+        file_stat = os.stat(file_path)
+        compressed_path = Path(dest_dir, file_path.name + self._COMPRESS_EXTS[compress])
+        logger.info(f"compressing '{file_path}' to '{compressed_path}' with {compress}")
+        with open(file_path, "rb") as source, open(compressed_path, "wb") as dest:
+            if compress == "gzip":
+                with gzip.GzipFile(fileobj=dest, mode="wb", mtime=0) as compressor:
+                    shutil.copyfileobj(source, compressor, 1024 * 1024)
+            else:
+                zstandard.ZstdCompressor(level=3).copy_stream(source, dest)
+        # Keep the source timestamps as these are uploaded as the file system info
+        os.utime(compressed_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+        return compressed_path
+
+    @staticmethod
+    def _clean_file_path(file_path: str | Path) -> Path:
+        """INTERNAL: Cleans a local file path by removing escape slashes and converting it to a Path object.
+        Positional arguments:
+            file_path (str|Path) -- path of the local source file to upload
+        Returns:
+            file_path (Path) -- cleaned path of the local source file
+        """
+        if os.name == "nt":  # Windows
+            return Path(os.fspath(file_path).replace("/", ""))
+        # Other systems including Mac, Linux
+        return Path(os.fspath(file_path).replace("\\", ""))
 
     def _get_local_file_metadata(self, file_path: str | Path) -> tuple[int, str, str]:
         """Retrieves local file metadata (size, dates).
@@ -1450,30 +2731,33 @@ class OneDrive:
             modified_date (str) -- UTC ISO format file last modified timestamp
         """
         # Validate file_path type and that the file exists
-        if not isinstance(file_path, str) and not isinstance(file_path, Path):
+        if not isinstance(file_path, (str, Path)):
             raise TypeError(
                 f"file_path expected 'str' or 'Path', got {type(file_path).__name__!r}"
             )
-        if not os.path.isfile(file_path):
+        # Stat the file once, the result is used for the checks, size and timestamps
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
             raise ValueError(
                 f"file_path expected a path to an existing file, got '{file_path!s}'"
             )
         # Get the file size
-        file_size = os.path.getsize(file_path)
+        file_size = file_stat.st_size
         # Get the file modified time
-        file_modified = os.path.getmtime(file_path)
+        file_modified = file_stat.st_mtime
         # Get the file creation time (platform specific)
         if sys.platform == "win32":
             # Windows OS
-            file_created = os.path.getctime(file_path)
+            file_created = file_stat.st_ctime
+        elif sys.platform == "darwin":
+            # Mac OS
+            file_created = file_stat.st_birthtime
         else:
-            stat = os.stat(file_path)
-            if sys.platform == "darwin":
-                # Mac OS
-                file_created = stat.st_birthtime
-            else:
-                # Likely Linux OS, fall back to last modified.
-                file_created = stat.st_mtime
+            # Likely Linux OS, fall back to last modified.
+            file_created = file_stat.st_mtime
         # Convert the seconds to UTC ISO timestamps
         file_created_str = (
             datetime.fromtimestamp(file_created)
@@ -1,6 +1,7 @@
 """Tests the config functions using pytest."""
 
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Any
@@ -20,9 +21,13 @@ from .conftest import REFRESH_TOKEN
 from .conftest import SCOPE
 from .conftest import TENANT
 from .conftest import TESTS_DIR
+from graph_onedrive import _config
 from graph_onedrive._config import _check_file_type
+from graph_onedrive._config import _json_dumps
+from graph_onedrive._config import _json_loads
 from graph_onedrive._config import dump_config
 from graph_onedrive._config import load_config
+from graph_onedrive._config import write_config
 
 
 class TestLoad:
@@ -88,6 +93,17 @@ class TestLoad:
         data = load_config(config_path)
         assert data == config
 
+    def test_load_config_cached(self, tmp_path):
+        config_path = Path(tmp_path, "config.json")
+        config_path.write_text(json.dumps({"onedrive": {"client_id": CLIENT_ID}}))
+        # Mutating the returned data must not affect later loads
+        data = load_config(config_path, "onedrive")
+        data["client_id"] = "changed"
+        assert load_config(config_path, "onedrive") == {"client_id": CLIENT_ID}
+        # Changing the file must invalidate the cached contents
+        config_path.write_text(json.dumps({"onedrive": {"client_id": "new value"}}))
+        assert load_config(config_path, "onedrive") == {"client_id": "new value"}
+
     def test_load_config_failure(self): ...
 
 
@@ -140,9 +156,97 @@ class TestDump:
         initial_file[config_key]["refresh_token"] = "new"
         assert read_data == initial_file
 
+    def test_dump_config_unchanged(self, tmp_path, monkeypatch):
+        config = {"client_id": CLIENT_ID, "refresh_token": REFRESH_TOKEN}
+        config_path = Path(tmp_path, "config.json")
+        dump_config(config, config_path, "onedrive")
+        written = []
+        monkeypatch.setattr(_config, "write_config", lambda *args: written.append(args))
+        dump_config(dict(config), config_path, "onedrive")
+        assert written == []
+        dump_config({**config, "refresh_token": "new"}, config_path, "onedrive")
+        assert len(written) == 1
+
+    @pytest.mark.parametrize("file_name", ["config.json", "test.yaml", "test.toml"])
+    def test_write_config_utf8(self, tmp_path, file_name):
+        config_path = Path(tmp_path, file_name)
+        write_config({"onedrive": {"display_name": "Zoë 東京"}}, config_path)
+        # The file must be valid UTF-8 whatever the platform default encoding is
+        config_path.read_bytes().decode("utf-8")
+        assert load_config(config_path, "onedrive") == {"display_name": "Zoë 東京"}
+
+    def test_write_config_atomic(self, tmp_path):
+        config_path = Path(tmp_path, "config.json")
+        write_config({"onedrive": {"client_id": CLIENT_ID}}, config_path)
+        config_path.chmod(0o600)
+        # A failed write must leave the existing file and its permissions in place
+        with pytest.raises(TypeError):
+            write_config({"onedrive": {"client_id": object()}}, config_path)
+        assert load_config(config_path, "onedrive") == {"client_id": CLIENT_ID}
+        write_config({"onedrive": {"client_id": "new"}}, config_path)
+        assert load_config(config_path, "onedrive") == {"client_id": "new"}
+        assert config_path.stat().st_mode & 0o777 == 0o600
+        assert [path.name for path in tmp_path.iterdir()] == ["config.json"]
+
+    def test_write_config_failure_permissions(self, tmp_path, monkeypatch):
+        config_path = Path(tmp_path, "config.json")
+        write_config({"onedrive": {"client_id": CLIENT_ID}}, config_path)
+        temp_fds = []
+        real_mkstemp = _config.tempfile.mkstemp
+
+        def mkstemp(*args, **kwargs):
+            temp_fd, temp_path = real_mkstemp(*args, **kwargs)
+            temp_fds.append(temp_fd)
+            return temp_fd, temp_path
+
+        def chmod(path, mode):
+            raise PermissionError(13, "Permission denied")
+
+        monkeypatch.setattr(_config.tempfile, "mkstemp", mkstemp)
+        monkeypatch.setattr(_config.os, "chmod", chmod)
+        with pytest.raises(PermissionError):
+            write_config({"onedrive": {"client_id": "new"}}, config_path)
+        # The temporary file is removed and its descriptor closed
+        assert [path.name for path in tmp_path.iterdir()] == ["config.json"]
+        with pytest.raises(OSError):
+            os.fstat(temp_fds[0])
+
     def test_dump_config_failure(self): ...
 
 
+class TestJson:
+    """Tests the _json_loads and _json_dumps functions."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize("indent", [True, False])
+    def test_json_round_trip(self, monkeypatch, use_orjson, indent):
+        if use_orjson and not _config.optionals_orjson:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(_config, "optionals_orjson", use_orjson)
+        data = {"onedrive": {"client_id": CLIENT_ID, "refresh_token": "ü"}}
+        encoded = _json_dumps(data, indent=indent)
+        assert isinstance(encoded, bytes)
+        assert (b"\n" in encoded) is indent
+        assert json.loads(encoded) == data
+        assert _json_loads(encoded) == data
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"onedrive": {"client_id": CLIENT_ID, "refresh_token": "ü", "n": [1, 2.5]}},
+            {1: "non str key", "big": 2**70},
+        ],
+    )
+    @pytest.mark.parametrize("indent", [True, False])
+    def test_json_dumps_backends(self, monkeypatch, data, indent):
+        if not _config.optionals_orjson:
+            pytest.skip("orjson not installed")
+        # Config files are written identically whether or not orjson is installed
+        encoded = _json_dumps(data, indent=indent)
+        monkeypatch.setattr(_config, "optionals_orjson", False)
+        assert _json_dumps(data, indent=indent) == encoded
+
+
 class TestFileTypeCheck:
     """Tests the _check_file_type function."""
 
@@ -1,7 +1,6 @@
 """Tests the OneDrive decorators pytest."""
 
-from datetime import datetime
-from datetime import timedelta
+import time
 
 import pytest
 import respx
@@ -18,10 +17,8 @@ class TestTokenRequiredDecorator:
 
     def test_token_required_expired(self, temp_onedrive):
         # Set the access token time as expired by 2 seconds
-        temp_onedrive._access_expires = datetime.timestamp(
-            datetime.now() - timedelta(seconds=2)
-        )
+        temp_onedrive._access_expires = time.monotonic() - 2
         # Make a call to a mathod that uses the decorator
         temp_onedrive.get_usage()
         # Check to ensure that the _access_expires is now in the future
-        assert temp_onedrive._access_expires > datetime.timestamp(datetime.now()) + 30
+        assert temp_onedrive._access_expires > time.monotonic() + 30
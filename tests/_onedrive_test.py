@@ -1,9 +1,18 @@
 """Tests the OneDrive class using pytest."""
 
+import asyncio
+import errno
+import gzip
 import json
 import logging
 import os
 import re
+import stat
+import time
+import urllib.parse
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from pathlib import Path
 
 import httpx
@@ -19,6 +28,8 @@ from .conftest import REFRESH_TOKEN
 from .conftest import SCOPE
 from .conftest import TENANT
 from .conftest import TESTS_DIR
+from graph_onedrive import _config
+from graph_onedrive import _onedrive
 from graph_onedrive._onedrive import GraphAPIError
 from graph_onedrive._onedrive import OneDrive
 
@@ -99,6 +110,15 @@ class TestDunders:
         (msg,) = excinfo.value.args
         assert msg == exp_msg
 
+    # __enter__, __exit__, close
+    def test_context_manager(self, mock_graph_api, mock_auth_api):
+        with OneDrive(
+            CLIENT_ID, CLIENT_SECRET, TENANT, REDIRECT, REFRESH_TOKEN
+        ) as onedrive:
+            assert isinstance(onedrive, OneDrive)
+            assert not onedrive._client.is_closed
+        assert onedrive._client.is_closed
+
     # __repr__
     def test_repr(self, onedrive):
         assert (
@@ -167,6 +187,43 @@ class TestConstructors:
         )
         assert isinstance(onedrive_instance, OneDrive)
 
+    def test_from_file_save_refresh_token(
+        self, tmp_path, monkeypatch, mock_graph_api, mock_auth_api
+    ):
+        # Make a temporary config file without a refresh token and with other data
+        config = {
+            "onedrive": {
+                "tenant_id": TENANT,
+                "client_id": CLIENT_ID,
+                "client_secret_value": CLIENT_SECRET,
+            },
+            "other data": 1234,
+        }
+        config_path = Path(tmp_path, "config.json")
+        config_path.write_text(json.dumps(config))
+        input_url = REDIRECT + "?code=" + AUTH_CODE
+        monkeypatch.setattr("builtins.input", lambda _: input_url)
+        # Run the test
+        OneDrive.from_file(config_path, save_refresh_token=True)
+        saved_config = json.loads(config_path.read_text())
+        assert saved_config["onedrive"]["refresh_token"] == REFRESH_TOKEN
+        assert saved_config["other data"] == 1234
+
+    @pytest.mark.asyncio
+    async def test_from_file_async(self, tmp_path, mock_graph_api, mock_auth_api):
+        config = {
+            "onedrive": {
+                "tenant_id": TENANT,
+                "client_id": CLIENT_ID,
+                "client_secret_value": CLIENT_SECRET,
+                "refresh_token": REFRESH_TOKEN,
+            }
+        }
+        config_path = Path(tmp_path, "config.json")
+        config_path.write_text(json.dumps(config))
+        onedrive_instance = await OneDrive.from_file_async(config_path)
+        assert isinstance(onedrive_instance, OneDrive)
+
     @pytest.mark.parametrize(
         "config_path, config_key, exp_msg",
         [
@@ -302,6 +359,7 @@ class TestResponseChecks:
             (200, 200, "", False),
             (400, [302, 400], "123", False),
             (500, ["blah", 500], "just a string", True),
+            (201, (200, 201), "a tuple", True),
         ],
     )
     def test_raise_unexpected_response(
@@ -340,6 +398,14 @@ class TestResponseChecks:
                 True,
                 "could not delete link (Invalid request)",
             ),
+            (
+                400,
+                {"error": "invalid_grant", "error_description": "Token expired"},
+                200,
+                "could not get access token",
+                True,
+                "could not get access token (Token expired)",
+            ),
             (
                 500,
                 {"error_description": "Unauthorized"},
@@ -348,6 +414,14 @@ class TestResponseChecks:
                 True,
                 "could not get headers (Unauthorized)",
             ),
+            (
+                404,
+                {"error": {"message": "Item not found"}},
+                (200, 206),
+                "item not downloaded",
+                False,
+                "item not downloaded (Item not found)",
+            ),
         ],
     )
     def test_raise_unexpected_response_failure(
@@ -361,6 +435,78 @@ class TestResponseChecks:
         (msg,) = excinfo.value.args
         assert msg == exp_msg
 
+    @pytest.mark.parametrize(
+        "resp_code, content_type, exp_msg",
+        [
+            (200, "text/plain", "just a test (response did not contain json)"),
+            (500, "application/json", "just a test (no error message returned)"),
+        ],
+    )
+    def test_raise_unexpected_response_failure_not_json(
+        self, onedrive, resp_code, content_type, exp_msg
+    ):
+        response = httpx.Response(
+            status_code=resp_code,
+            headers={"content-type": content_type},
+            content=b"<html>not json</html>",
+        )
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive._raise_unexpected_response(
+                response, 200, "just a test", has_json=True
+            )
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
+    @pytest.mark.parametrize(
+        "content_type",
+        [
+            "application/json",
+            "application/json; odata.metadata=minimal; charset=utf-8",
+            "Application/JSON",
+        ],
+    )
+    def test_raise_unexpected_response_content_type(self, onedrive, content_type):
+        response = httpx.Response(
+            status_code=400,
+            headers={"content-type": content_type},
+            content=b'{"error": {"message": "Invalid request"}}',
+        )
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive._raise_unexpected_response(
+                response, 200, "just a test", has_json=True
+            )
+        (msg,) = excinfo.value.args
+        assert msg == "just a test (Invalid request)"
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize(
+        "content, exp_msg",
+        [
+            (
+                b'{"error": {"message": "Invalid request"}}',
+                "just a test (Invalid request)",
+            ),
+            (b"{not json", "just a test (no error message returned)"),
+        ],
+    )
+    def test_raise_unexpected_response_json_backends(
+        self, onedrive, monkeypatch, use_orjson, content, exp_msg
+    ):
+        if use_orjson and not _config.optionals_orjson:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(_config, "optionals_orjson", use_orjson)
+        response = httpx.Response(
+            status_code=400,
+            headers={"content-type": "application/json"},
+            content=content,
+        )
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive._raise_unexpected_response(
+                response, 200, "just a test", has_json=True
+            )
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
 
 class TestGetTokens:
     """Tests the _get_token method."""
@@ -381,6 +527,24 @@ class TestGetTokens:
         assert temp_onedrive.refresh_token == REFRESH_TOKEN
         assert temp_onedrive._access_token == ACCESS_TOKEN
 
+    def test_get_token_request(self, temp_onedrive, mock_auth_api, caplog):
+        with caplog.at_level(logging.DEBUG, logger="graph_onedrive"):
+            temp_onedrive._get_token()
+        request = mock_auth_api.routes["access_token"].calls.last.request
+        assert request.headers["content-type"] == "application/x-www-form-urlencoded"
+        query = urllib.parse.parse_qs(request.content.decode())
+        assert query["grant_type"] == ["refresh_token"]
+        assert query["client_secret"] == [CLIENT_SECRET]
+        # Secrets are not written to the logs
+        assert CLIENT_SECRET not in caplog.text
+        assert REFRESH_TOKEN not in caplog.text
+
+    def test_get_token_access_expires(self, temp_onedrive):
+        before = time.monotonic()
+        temp_onedrive._get_token()
+        # Mocked token expires_in=100, less 60 seconds margin
+        assert before + 40 <= temp_onedrive._access_expires <= time.monotonic() + 40
+
     def test_get_token_failure_bad_request_token(self, temp_onedrive):
         temp_onedrive.refresh_token = "badtoken"
         with pytest.raises(GraphAPIError) as excinfo:
@@ -443,6 +607,23 @@ class TestAuthorization:
         auth_code = temp_onedrive._get_authorization()
         assert auth_code == AUTH_CODE
 
+    def test_get_authorization_url(self, temp_onedrive, monkeypatch, capsys):
+        # monkeypatch the response url typically input by user
+        input_url = REDIRECT + "?code=" + AUTH_CODE
+        monkeypatch.setattr("builtins.input", lambda _: input_url)
+        # make the request and parse the printed authorization url
+        temp_onedrive._get_authorization()
+        stdout, sterr = capsys.readouterr()
+        url_match = re.search("^https://.+authorize\\?.+$", stdout, re.M)
+        assert url_match is not None
+        request_url = url_match.group(0)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(request_url).query)
+        assert query["client_id"] == [CLIENT_ID]
+        assert query["redirect_uri"] == [REDIRECT]
+        assert query["scope"] == [SCOPE]
+        assert query["response_type"] == ["code"]
+        assert re.fullmatch("[A-Za-z0-9_-]{11}", query["state"][0])
+
     @pytest.mark.parametrize(
         "input_url, exp_msg",
         [
@@ -455,6 +636,15 @@ class TestAuthorization:
                 REDIRECT + "?code=123&state=blah",
                 "response 'state' not for this request, occurs when reusing an old authorization url",
             ),
+            (
+                REDIRECT + "?error=access_denied",
+                "authorization failed (access_denied)",
+            ),
+            (
+                REDIRECT
+                + "?error=access_denied&error_description=The+user+declined+consent",
+                "authorization failed (The user declined consent)",
+            ),
         ],
     )
     def test_get_authorization_failure(
@@ -491,6 +681,9 @@ class TestHeaders:
         temp_onedrive._create_headers()
         exp_headers = {"Accept": "*/*", "Authorization": "Bearer " + ACCESS_TOKEN}
         assert temp_onedrive._headers == exp_headers
+        assert (
+            temp_onedrive._client.headers["Authorization"] == "Bearer " + ACCESS_TOKEN
+        )
 
     def test_create_headers_failure_value(self, temp_onedrive):
         temp_onedrive._headers = {}
@@ -501,6 +694,46 @@ class TestHeaders:
         assert msg == "expected self._access_token to be set, got empty string"
 
 
+class TestJsonContent:
+    """Tests the _json_content method."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_json_content(self, onedrive, monkeypatch, use_orjson):
+        if use_orjson and not _config.optionals_orjson:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(_config, "optionals_orjson", use_orjson)
+        kwargs = onedrive._json_content({"name": "résumé.txt", "folder": {}})
+        assert kwargs["headers"] == {"Content-Type": "application/json"}
+        # Compact and UTF-8 encoded rather than escaped
+        assert kwargs["content"] == '{"name":"résumé.txt","folder":{}}'.encode()
+
+    def test_json_content_none(self, onedrive):
+        assert onedrive._json_content(None) == {}
+
+    def test_json_content_request(self, onedrive, mock_graph_api):
+        onedrive.rename_item("01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG", "résumé.txt")
+        request = mock_graph_api.routes["patch_item"].calls.last.request
+        assert request.headers["content-type"] == "application/json"
+        assert json.loads(request.content) == {"name": "résumé.txt"}
+
+
+class TestAsyncClient:
+    """Tests the _async_client method."""
+
+    @pytest.mark.asyncio
+    async def test_async_client(self, onedrive):
+        async with onedrive._async_client() as client:
+            assert client.headers["Authorization"] == "Bearer " + ACCESS_TOKEN
+            pool = client._transport._pool
+            assert pool._max_connections == onedrive._CLIENT_LIMITS.max_connections
+
+    @pytest.mark.asyncio
+    async def test_async_client_max_connections(self, onedrive):
+        # The pool serves every concurrent request rather than queueing the extra ones
+        async with onedrive._async_client(max_connections=32) as client:
+            assert client._transport._pool._max_connections == 32
+
+
 class TestDriveDetails:
     """Tests the _get_drive_details, get_usage methods."""
 
@@ -520,6 +753,29 @@ class TestDriveDetails:
         assert onedrive._quota_remaining == 1099217263127
         assert onedrive._quota_total == 1099511627776
 
+    def test_get_drive_details_select(self, onedrive, mock_graph_api):
+        onedrive._get_drive_details()
+        request = mock_graph_api.routes["drive_details"].calls.last.request
+        assert request.url.params["$select"] == "id,name,driveType,owner,quota"
+
+    def test_get_drive_details_lazy(self, mock_graph_api, mock_auth_api):
+        call_count = mock_graph_api.routes["drive_details"].call_count
+        onedrive = OneDrive(CLIENT_ID, CLIENT_SECRET, TENANT, REDIRECT, REFRESH_TOKEN)
+        assert mock_graph_api.routes["drive_details"].call_count == call_count
+        assert onedrive._drive_type == "business"
+        assert onedrive._owner_name == "Megan Bowen"
+        assert mock_graph_api.routes["drive_details"].call_count == call_count + 1
+        with pytest.raises(AttributeError):
+            onedrive._not_an_attribute
+
+    def test_get_drive_details_not_needed(self, mock_graph_api, mock_auth_api):
+        call_count = mock_graph_api.routes["drive_details"].call_count
+        onedrive = OneDrive(CLIENT_ID, CLIENT_SECRET, TENANT, REDIRECT, REFRESH_TOKEN)
+        onedrive.list_directory()
+        onedrive.detail_item("01BYE5RZ6KU4MREZDFEVGKWRBC7OK4ET3J")
+        assert not hasattr(onedrive, "_not_an_attribute")
+        assert mock_graph_api.routes["drive_details"].call_count == call_count
+
     @pytest.mark.parametrize(
         "json_returned, exp_msg",
         [
@@ -564,6 +820,22 @@ class TestDriveDetails:
         assert round(capacity, 1) == round(exp_capacity, 1)
         assert unit == exp_unit
 
+    def test_get_usage_bytes(self, onedrive):
+        used, capacity, unit = onedrive.get_usage(unit="b")
+        assert (used, capacity) == (106330475, 1099511627776)
+        assert isinstance(used, int) and isinstance(capacity, int)
+
+    def test_get_usage_refresh(self, onedrive, mock_graph_api, monkeypatch):
+        route = mock_graph_api.routes["drive_details"]
+        onedrive.get_usage(refresh=True)
+        call_count = route.call_count
+        # Details requested within the ttl are reused
+        onedrive.get_usage(refresh=True)
+        assert route.call_count == call_count
+        monkeypatch.setattr(onedrive, "_DRIVE_DETAILS_TTL", 0.0)
+        onedrive.get_usage(refresh=True)
+        assert route.call_count == call_count + 1
+
     def test_get_usage_verbose(self, onedrive, capsys):
         onedrive.get_usage(verbose=True)
         stdout, sterr = capsys.readouterr()
@@ -601,6 +873,167 @@ class TestListingDirectories:
         items = onedrive.list_directory(item_id)
         assert items[0].get("id") == "01BYE5RZZWSN2ASHUEBJH2XJJ25WSEBUJ3"
 
+    def test_list_directory_compressed(self, onedrive, mock_graph_api):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        body = json.dumps({"value": [{"id": "1", "name": "a"}]}).encode()
+        route.side_effect = None
+        route.return_value = httpx.Response(
+            200,
+            content=gzip.compress(body),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        items = onedrive.list_directory()
+        request = route.calls.last.request
+        route.rollback()
+        assert "gzip" in request.headers["Accept-Encoding"]
+        assert items == [{"id": "1", "name": "a"}]
+
+    def test_list_directory_pages(self, onedrive, mock_graph_api):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        next_link = (
+            "https://graph.microsoft.com/v1.0/me/drive/root/children?$skiptoken=2"
+        )
+        route.side_effect = [
+            httpx.Response(
+                200, json={"value": [{"id": "1"}], "@odata.nextLink": next_link}
+            ),
+            httpx.Response(200, json={"value": [{"id": "2"}]}),
+        ]
+        items = onedrive.list_directory()
+        assert [item["id"] for item in items] == ["1", "2"]
+        assert route.calls[-2].request.url.params["$top"] == "999"
+        assert route.calls[-1].request.url == next_link
+        route.rollback()
+
+    # iter_directory
+    def test_iter_directory(self, onedrive, mock_graph_api):
+        call_count = mock_graph_api.routes["list_directory"].call_count
+        items = onedrive.iter_directory()
+        # No request is made until the iteration starts
+        assert mock_graph_api.routes["list_directory"].call_count == call_count
+        assert next(items).get("id") == "01BYE5RZ6QN3ZWBTUFOFD3GSPGOHDJD36K"
+
+    def test_iter_directory_token_expired(self, onedrive, mock_graph_api, monkeypatch):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        next_link = (
+            "https://graph.microsoft.com/v1.0/me/drive/root/children?$skiptoken=2"
+        )
+        route.side_effect = [
+            httpx.Response(
+                200, json={"value": [{"id": "1"}], "@odata.nextLink": next_link}
+            ),
+            httpx.Response(200, json={"value": [{"id": "2"}]}),
+        ]
+        refreshed = []
+
+        def get_token():
+            refreshed.append(route.call_count)
+            onedrive._access_expires = time.monotonic() + 100
+
+        monkeypatch.setattr(onedrive, "_get_token", get_token)
+        monkeypatch.setattr(onedrive, "_access_expires", onedrive._access_expires)
+        items = onedrive.iter_directory()
+        assert next(items) == {"id": "1"}
+        # The token expires while the first page is consumed
+        onedrive._access_expires = time.monotonic() - 1
+        call_count = route.call_count
+        assert next(items) == {"id": "2"}
+        route.rollback()
+        # The token is refreshed before the next page is requested
+        assert refreshed == [call_count]
+
+    def test_iter_directory_failure_type(self, onedrive):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.iter_directory(123)
+        (msg,) = excinfo.value.args
+        assert msg == "folder_id expected 'str', got 'int'"
+
+    # iter_directory_async
+    @pytest.mark.asyncio
+    async def test_iter_directory_async(self, onedrive, mock_graph_api):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        next_link = (
+            "https://graph.microsoft.com/v1.0/me/drive/root/children?$skiptoken=2"
+        )
+        route.side_effect = [
+            httpx.Response(
+                200, json={"value": [{"id": "1"}], "@odata.nextLink": next_link}
+            ),
+            httpx.Response(200, json={"value": [{"id": "2"}]}),
+        ]
+        items = onedrive.iter_directory_async()
+        assert await items.__anext__() == {"id": "1"}
+        # The next page is requested before the first page has been consumed
+        await asyncio.sleep(0)
+        assert route.calls[-1].request.url == next_link
+        assert [item["id"] async for item in items] == ["2"]
+        route.rollback()
+
+    @pytest.mark.asyncio
+    async def test_iter_directory_async_token_expired(
+        self, onedrive, mock_graph_api, monkeypatch
+    ):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        route.side_effect = [httpx.Response(200, json={"value": [{"id": "1"}]})]
+        refreshed = []
+
+        def get_token():
+            refreshed.append(route.call_count)
+            onedrive._access_expires = time.monotonic() + 100
+
+        monkeypatch.setattr(onedrive, "_get_token", get_token)
+        monkeypatch.setattr(onedrive, "_access_expires", time.monotonic() - 1)
+        # The token is checked when the page is requested, not when iteration is set up
+        items = onedrive.iter_directory_async()
+        assert refreshed == []
+        call_count = route.call_count
+        assert [item["id"] async for item in items] == ["1"]
+        route.rollback()
+        assert refreshed == [call_count]
+
+    @pytest.mark.asyncio
+    async def test_iter_directory_async_early_close(self, onedrive, mock_graph_api):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        next_link = (
+            "https://graph.microsoft.com/v1.0/me/drive/root/children?$skiptoken=2"
+        )
+        route.side_effect = [
+            httpx.Response(
+                200, json={"value": [{"id": "1"}], "@odata.nextLink": next_link}
+            ),
+            httpx.Response(200, json={"value": [{"id": "2"}]}),
+        ]
+        items = onedrive.iter_directory_async()
+        assert await items.__anext__() == {"id": "1"}
+        await items.aclose()
+        route.rollback()
+        # The cancelled prefetch has finished before the iterator is closed
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+        assert not pending
+
+    @pytest.mark.asyncio
+    async def test_iter_directory_async_failure(self, onedrive, mock_graph_api):
+        route = mock_graph_api.routes["list_directory"]
+        route.snapshot()
+        route.side_effect = [httpx.Response(404, json={"error": {"message": "nope"}})]
+        with pytest.raises(GraphAPIError) as excinfo:
+            [item async for item in onedrive.iter_directory_async()]
+        (msg,) = excinfo.value.args
+        assert msg == "directory could not be listed (nope)"
+        route.rollback()
+
+    def test_iter_directory_async_failure_type(self, onedrive):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.iter_directory_async(123)
+        (msg,) = excinfo.value.args
+        assert msg == "folder_id expected 'str', got 'int'"
+
     @pytest.mark.skip(reason="not implemented")
     def test_list_directory_failure(self, onedrive): ...
 
@@ -626,6 +1059,21 @@ class TestSearch:
         items = onedrive.search(query, top=top)
         assert len(items) == exp_len
 
+    def test_search_pages(self, onedrive, mock_graph_api):
+        route = mock_graph_api.routes["search"]
+        route.snapshot()
+        next_link = "https://graph.microsoft.com/v1.0/me/drive/root/search(q='Sales')?$skiptoken=s!2"
+        route.side_effect = [
+            httpx.Response(
+                200, json={"value": [{"id": "1"}], "@odata.nextLink": next_link}
+            ),
+            httpx.Response(200, json={"value": [{"id": "2"}]}),
+        ]
+        # Without a limit all the pages are returned
+        items = onedrive.search("Sales")
+        assert [item["id"] for item in items] == ["1", "2"]
+        route.rollback()
+
     @pytest.mark.skip(reason="not implemented")
     def test_search_failure(self, onedrive): ...
 
@@ -711,6 +1159,44 @@ class TestItemDetails:
         stdout, sterr = capsys.readouterr()
         assert stdout == exp_stout
 
+    def test_print_item_details_missing(self, onedrive, capsys):
+        onedrive._print_item_details(
+            {"id": "1", "name": "a", "createdBy": None, "fileSystemInfo": None}
+        )
+        stdout, sterr = capsys.readouterr()
+        assert "created: None by: None\n" in stdout
+        assert "file system created: None\n" in stdout
+
+    def test_detail_item_throttled(self, onedrive, mock_graph_api):
+        mock_graph_api.routes["detail_item"].snapshot()
+        mock_graph_api.routes["detail_item"].side_effect = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"name": "retried"}),
+        ]
+        item_details = onedrive.detail_item(
+            "01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL", refresh=True
+        )
+        assert item_details == {"name": "retried"}
+        mock_graph_api.routes["detail_item"].rollback()
+
+    def test_detail_item_cached(self, temp_onedrive, mock_graph_api):
+        item_id = "01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL"
+        call_count = mock_graph_api.routes["detail_item"].call_count
+        item_details = temp_onedrive.detail_item(item_id)
+        # Modifying the returned details does not modify the cache
+        item_details["name"] = "modified"
+        assert temp_onedrive.detail_item(item_id)["name"] != "modified"
+        assert mock_graph_api.routes["detail_item"].call_count == call_count + 1
+        temp_onedrive.detail_item(item_id, refresh=True)
+        assert mock_graph_api.routes["detail_item"].call_count == call_count + 2
+
+    def test_detail_item_cache_size(self, temp_onedrive, monkeypatch):
+        monkeypatch.setattr(temp_onedrive, "_DETAIL_CACHE_SIZE", 2)
+        for item_id in ("1", "2", "3"):
+            temp_onedrive._cache_item_details({"id": item_id})
+        assert list(temp_onedrive._detail_cache) == ["2", "3"]
+
     @pytest.mark.skip(reason="not implemented")
     def test_detail_item_failure(self): ...
 
@@ -720,6 +1206,70 @@ class TestItemDetails:
         item_details = onedrive.detail_item_path(item_path)
         assert item_details.get("name") == "Contoso Electronics Sales Presentation.pptx"
 
+    # detail_items
+    def test_detail_items(self, onedrive):
+        item_ids = [
+            "01BYE5RZ6TAJHXA5GMWZB2HDLD7SNEXFFU",
+            "01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL",
+        ]
+        items_details = onedrive.detail_items(item_ids)
+        assert [item.get("name") for item in items_details] == [
+            "CR-227 Project",
+            "Contoso Patent Template.docx",
+        ]
+
+    def test_detail_items_throttled(self, onedrive, mock_graph_api):
+        mock_graph_api.routes["detail_item"].snapshot()
+        mock_graph_api.routes["detail_item"].side_effect = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"name": "retried"}),
+        ]
+        items_details = onedrive.detail_items(
+            ["01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL"], refresh=True
+        )
+        assert items_details == [{"name": "retried"}]
+        mock_graph_api.routes["detail_item"].rollback()
+
+    def test_detail_items_cached(self, onedrive, mock_graph_api):
+        item_id = "01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL"
+        onedrive.detail_item(item_id, refresh=True)
+        call_count = mock_graph_api.routes["batch"].call_count
+        items_details = onedrive.detail_items([item_id, item_id])
+        assert mock_graph_api.routes["batch"].call_count == call_count
+        assert items_details[0] == items_details[1]
+        assert items_details[0] is not items_details[1]
+
+    def test_detail_items_failure(self, onedrive):
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.detail_items(["01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL", "999"])
+        (msg,) = excinfo.value.args
+        assert msg == "item could not be detailed (Invalid request)"
+
+    @pytest.mark.parametrize(
+        "item_ids, exp_msg",
+        [
+            ("123", "item_ids expected 'list', got 'str'"),
+            (["123", 4], "item_ids expected list of 'str', got 'int' item"),
+        ],
+    )
+    def test_detail_items_failure_type(self, onedrive, item_ids, exp_msg):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.detail_items(item_ids)
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
+    @pytest.mark.asyncio
+    async def test_detail_items_failure_running_loop(self, onedrive, mock_graph_api):
+        call_count = mock_graph_api.routes["batch"].call_count
+        with pytest.raises(RuntimeError) as excinfo:
+            onedrive.detail_items(["01BYE5RZ2XXKUBPDYT7JGLPHYXALBIXKEL"], refresh=True)
+        (msg,) = excinfo.value.args
+        assert msg == (
+            "detail_items cannot be called from a running event loop, "
+            "use 'await asyncio.to_thread(onedrive.detail_items, ...)' instead"
+        )
+        assert mock_graph_api.routes["batch"].call_count == call_count
+
     # item_type
     @pytest.mark.parametrize(
         "item_id, exp_type",
@@ -732,6 +1282,14 @@ class TestItemDetails:
         item_type = onedrive.item_type(item_id)
         assert item_type == exp_type
 
+    def test_item_type_cached(self, onedrive, mock_graph_api):
+        item_id = "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P"
+        onedrive.detail_item(item_id, refresh=True)
+        call_count = mock_graph_api.routes["detail_item"].call_count
+        assert onedrive.is_folder(item_id)
+        assert not onedrive.is_file(item_id)
+        assert mock_graph_api.routes["detail_item"].call_count == call_count
+
     @pytest.mark.skip(reason="not implemented")
     def test_item_type_failure(self): ...
 
@@ -838,6 +1396,16 @@ class TestSharingLink:
         )
         assert link == exp_link
 
+    def test_create_share_link_expiration(self, onedrive, mock_graph_api):
+        tzinfo = timezone(timedelta(hours=10))
+        expiration = datetime(2999, 1, 2, 10, 30, 15, 123456, tzinfo=tzinfo)
+        onedrive.create_share_link(
+            "01BYE5RZ6KU4MREZDFEVGKWRBC7OK4ET3J", expiration=expiration
+        )
+        request = mock_graph_api.routes["create_share_link"].calls.last.request
+        body = json.loads(request.content)
+        assert body["expirationDateTime"] == "2999-01-02T00:30:15Z"
+
     @pytest.mark.parametrize(
         "item_id, link_type, password, expiration, scope, exp_msg",
         [
@@ -937,12 +1505,46 @@ class TestMakeFolder:
         item_id = onedrive.make_folder(folder_name, parent_folder_id, check_existing)
         assert item_id == exp_str
 
+    @pytest.mark.parametrize(
+        "folder_name, parent_folder_id, exp_str",
+        [
+            ("Notebooks", None, "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P"),
+            (
+                "Notebooks",
+                "01BYE5RZ56Y2GOVW7725BZO354PWSELRRZ",
+                "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P",
+            ),
+        ],
+    )
+    def test_make_folder_existing(
+        self, onedrive, mock_graph_api, folder_name, parent_folder_id, exp_str
+    ):
+        call_count = mock_graph_api.routes["make_folder"].call_count
+        item_id = onedrive.make_folder(folder_name, parent_folder_id)
+        assert item_id == exp_str
+        assert mock_graph_api.routes["make_folder"].call_count == call_count
+
+    def test_make_folder_existing_file(self, onedrive, mock_graph_api):
+        # A file with the same name is found by one path lookup, then a folder is made
+        path_count = mock_graph_api.routes["detail_item_path"].call_count
+        make_count = mock_graph_api.routes["make_folder"].call_count
+        item_id = onedrive.make_folder("Temperatures.xlsx")
+        assert item_id == "ACEA49D1-144"
+        assert mock_graph_api.routes["detail_item_path"].call_count == path_count + 1
+        assert mock_graph_api.routes["make_folder"].call_count == make_count + 1
+
+    def test_make_folder_cached(self, onedrive, mock_graph_api):
+        item_id = onedrive.make_folder("tesy 1", check_existing=False)
+        call_count = mock_graph_api.routes["detail_item"].call_count
+        assert onedrive.is_folder(item_id)
+        assert mock_graph_api.routes["detail_item"].call_count == call_count
+
     @pytest.mark.skip(reason="not implemented")
     def test_make_folder_failure(self): ...
 
 
 class TestMove:
-    """Tests the move_item method."""
+    """Tests the move_item, move_items methods."""
 
     @pytest.mark.parametrize(
         "item_id, new_folder_id, new_name",
@@ -1000,6 +1602,47 @@ class TestMove:
         (msg,) = excinfo.value.args
         assert msg == exp_msg
 
+    def test_move_items(self, onedrive, mock_graph_api):
+        # More than 20 items are split across multiple batches
+        item_ids = ["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"] * 25
+        new_folder_id = "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P"
+        call_count = mock_graph_api.routes["batch"].call_count
+        moved_items = onedrive.move_items(item_ids, new_folder_id)
+        assert moved_items == [(item_ids[0], new_folder_id)] * 25
+        assert mock_graph_api.routes["batch"].call_count - call_count == 2
+
+    def test_move_items_failure(self, onedrive):
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.move_items(["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"], "456")
+        (msg,) = excinfo.value.args
+        assert msg == "item not moved (Invalid request)"
+
+    @pytest.mark.parametrize(
+        "item_ids, new_folder_id, exp_msg",
+        [
+            ("123", "456", "item_ids expected 'list', got 'str'"),
+            (["123", 4], "456", "item_ids expected list of 'str', got 'int' item"),
+            (["123"], 456, "new_folder_id expected 'str', got 'int'"),
+        ],
+    )
+    def test_move_items_failure_type(self, onedrive, item_ids, new_folder_id, exp_msg):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.move_items(item_ids, new_folder_id)
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
+    @pytest.mark.asyncio
+    async def test_move_items_failure_running_loop(self, onedrive, mock_graph_api):
+        call_count = mock_graph_api.routes["batch"].call_count
+        with pytest.raises(RuntimeError) as excinfo:
+            onedrive.move_items(
+                ["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"],
+                "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P",
+            )
+        (msg,) = excinfo.value.args
+        assert msg.startswith("move_items cannot be called from a running event loop")
+        assert mock_graph_api.routes["batch"].call_count == call_count
+
 
 class TestCopy:
     """Tests the copy_item method."""
@@ -1047,6 +1690,81 @@ class TestCopy:
         # You may need to rerun all the tests if there is an issue to reset the call count
         assert stdout == exp_stdout
 
+    def test_copy_item_wait(self, onedrive, mock_graph_api, monkeypatch):
+        sleeps: list[float] = []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+        mock_graph_api.routes["copy_item_monitor"].snapshot()
+        mock_graph_api.routes["copy_item_monitor"].side_effect = [
+            httpx.Response(
+                202,
+                headers={"Retry-After": "5"},
+                json={"status": "inProgress", "percentageComplete": 10.0},
+            ),
+            httpx.Response(
+                202, json={"status": "inProgress", "percentageComplete": 10.0}
+            ),
+            httpx.Response(
+                202, json={"status": "completed", "resourceId": "01MOWKYVJML57KN2"}
+            ),
+        ]
+        new_item_id = onedrive.copy_item(
+            "01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG",
+            "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P",
+        )
+        mock_graph_api.routes["copy_item_monitor"].rollback()
+        assert new_item_id == "01MOWKYVJML57KN2"
+        # Retry-After is a lower bound, no progress backs off from the last wait
+        assert sleeps[:2] == [1.0, 5.0]
+        assert 7.5 <= sleeps[2] <= 7.75
+
+    def test_copy_item_not_started(self, onedrive, mock_graph_api, monkeypatch):
+        monkeypatch.setattr(time, "sleep", lambda seconds: None)
+        mock_graph_api.routes["copy_item_monitor"].snapshot()
+        mock_graph_api.routes["copy_item_monitor"].side_effect = [
+            httpx.Response(202, json={"status": "notStarted"}),
+            httpx.Response(
+                202, json={"status": "completed", "resourceId": "01MOWKYVJML57KN2"}
+            ),
+        ]
+        new_item_id = onedrive.copy_item(
+            "01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG",
+            "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P",
+        )
+        mock_graph_api.routes["copy_item_monitor"].rollback()
+        assert new_item_id == "01MOWKYVJML57KN2"
+
+    def test_copy_item_failed_status(self, onedrive, mock_graph_api):
+        mock_graph_api.routes["copy_item_monitor"].snapshot()
+        mock_graph_api.routes["copy_item_monitor"].side_effect = None
+        mock_graph_api.routes["copy_item_monitor"].return_value = httpx.Response(
+            202, json={"status": "failed", "percentageComplete": 10.0}
+        )
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.copy_item(
+                "01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG",
+                "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P",
+                confirm_complete=True,
+            )
+        mock_graph_api.routes["copy_item_monitor"].rollback()
+        (msg,) = excinfo.value.args
+        assert msg == "item not copied (copy operation failed)"
+
+    def test_copy_item_failed_monitor(self, onedrive, mock_graph_api):
+        mock_graph_api.routes["copy_item_monitor"].snapshot()
+        mock_graph_api.routes["copy_item_monitor"].side_effect = None
+        mock_graph_api.routes["copy_item_monitor"].return_value = httpx.Response(
+            404, json={"error": {"message": "Monitor not found"}}
+        )
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.copy_item(
+                "01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG",
+                "01BYE5RZ5YOS4CWLFWORAJ4U63SCA3JT5P",
+                confirm_complete=True,
+            )
+        mock_graph_api.routes["copy_item_monitor"].rollback()
+        (msg,) = excinfo.value.args
+        assert msg == "item not copied (Monitor not found)"
+
     @pytest.mark.parametrize(
         "item_id, new_folder_id",
         [
@@ -1083,7 +1801,7 @@ class TestCopy:
 
 
 class TestRename:
-    """Tests the rename_item method."""
+    """Tests the rename_item, rename_items methods."""
 
     def test_rename_item(self, onedrive):
         item_id = "01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"
@@ -1094,9 +1812,45 @@ class TestRename:
     @pytest.mark.skip(reason="not implemented")
     def test_rename_item_failure(self): ...
 
+    def test_rename_items(self, onedrive, mock_graph_api):
+        item_id = "01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"
+        call_count = mock_graph_api.routes["batch"].call_count
+        item_names = onedrive.rename_items({item_id: "new-item-name.txt"})
+        assert item_names == ["new-item-name.txt"]
+        assert mock_graph_api.routes["batch"].call_count - call_count == 1
+
+    def test_rename_items_failure(self, onedrive):
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.rename_items({"999": "new-item-name.txt"})
+        (msg,) = excinfo.value.args
+        assert msg == "item not renamed (Invalid request)"
+
+    @pytest.mark.parametrize(
+        "new_names, exp_msg",
+        [
+            (["999"], "new_names expected 'dict', got 'list'"),
+            ({9: "name.txt"}, "new_names expected 'str' keys, got 'int' key"),
+            ({"999": None}, "new_names expected 'str' values, got 'NoneType' value"),
+        ],
+    )
+    def test_rename_items_failure_type(self, onedrive, new_names, exp_msg):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.rename_items(new_names)
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
+    @pytest.mark.asyncio
+    async def test_rename_items_failure_running_loop(self, onedrive, mock_graph_api):
+        call_count = mock_graph_api.routes["batch"].call_count
+        with pytest.raises(RuntimeError) as excinfo:
+            onedrive.rename_items({"01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG": "new.txt"})
+        (msg,) = excinfo.value.args
+        assert msg.startswith("rename_items cannot be called from a running event loop")
+        assert mock_graph_api.routes["batch"].call_count == call_count
+
 
 class TestDelete:
-    """Tests the delete_item method."""
+    """Tests the delete_item, delete_items methods."""
 
     def test_delete_item(self, onedrive):
         response = onedrive.delete_item(
@@ -1128,6 +1882,7 @@ class TestDelete:
         [
             (999, False, "item_id expected 'str', got 'int'"),
             ("999", "true", "pre_confirm expected 'bool', got 'str'"),
+            ("999", 1, "pre_confirm expected 'bool', got 'int'"),
         ],
     )
     def test_delete_item_failure_type(self, onedrive, item_id, pre_confirm, exp_msg):
@@ -1136,6 +1891,51 @@ class TestDelete:
         (msg,) = excinfo.value.args
         assert msg == exp_msg
 
+    # delete_items
+    def test_delete_items(self, onedrive, mock_graph_api):
+        # More than 20 items are split across multiple batches
+        item_ids = ["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"] * 25
+        call_count = mock_graph_api.routes["batch"].call_count
+        response = onedrive.delete_items(item_ids, pre_confirm=True)
+        assert response == True
+        assert mock_graph_api.routes["batch"].call_count - call_count == 2
+
+    def test_delete_items_manual_confirm_abort(self, onedrive, monkeypatch):
+        monkeypatch.setattr("builtins.input", lambda _: "no")
+        response = onedrive.delete_items(["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"])
+        assert response == False
+
+    def test_delete_items_failure(self, onedrive):
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.delete_items(
+                ["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG", "999"], pre_confirm=True
+            )
+        (msg,) = excinfo.value.args
+        assert msg == "item not deleted (Invalid request)"
+
+    @pytest.mark.asyncio
+    async def test_delete_items_failure_running_loop(self, onedrive, mock_graph_api):
+        call_count = mock_graph_api.routes["batch"].call_count
+        with pytest.raises(RuntimeError) as excinfo:
+            onedrive.delete_items(["01BYE5RZ53CPZEMSJFTZDJ6AEFVZP3C3BG"], True)
+        (msg,) = excinfo.value.args
+        assert msg.startswith("delete_items cannot be called from a running event loop")
+        assert mock_graph_api.routes["batch"].call_count == call_count
+
+    @pytest.mark.parametrize(
+        "item_ids, pre_confirm, exp_msg",
+        [
+            ("999", True, "item_ids expected 'list', got 'str'"),
+            (["999", 9], True, "item_ids expected list of 'str', got 'int' item"),
+            (["999"], "true", "pre_confirm expected 'bool', got 'str'"),
+        ],
+    )
+    def test_delete_items_failure_type(self, onedrive, item_ids, pre_confirm, exp_msg):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.delete_items(item_ids, pre_confirm)
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
 
 class TestDownload:
     """Tests the download_file, _download_async, _download_async_part methods."""
@@ -1147,24 +1947,115 @@ class TestDownload:
     @pytest.mark.skip(reason="not implemented")
     def test_download_file_failure(self): ...
 
-    """# _download_async
-    @pytest.mark.skip(reason="not implemented")
-    async def test_download_async(self):
-        ...
-
-    @pytest.mark.skip(reason="not implemented")
-    async def test_download_async_failure(self):
-        ...
-
-    # _download_async_part
-    @pytest.mark.skip(reason="not implemented")
-    async def test_download_async_part(self):
-        ...
-
-    @pytest.mark.skip(reason="not implemented")
-    async def test_download_async_part_failure(self):
-        ...
-    """
+    # _download_async
+    @pytest.mark.asyncio
+    async def test_download_async(self, onedrive, mock_graph_api, tmp_path):
+        content = os.urandom(5 * 1024 * 1024 + 123)
+
+        def side_effect_download(request):
+            byte_re = re.search("^bytes=([0-9]+)-([0-9]+)$", request.headers["Range"])
+            assert byte_re is not None
+            start, end = int(byte_re.group(1)), int(byte_re.group(2))
+            return httpx.Response(206, content=content[start : end + 1])
+
+        download_url = "https://public.dm.files.1drv.com/download"
+        mock_graph_api.snapshot()
+        mock_graph_api.get(download_url).mock(side_effect=side_effect_download)
+        file_path = Path(tmp_path, "download.bin")
+        await onedrive._download_async(download_url, file_path, len(content), 4)
+        mock_graph_api.rollback()
+        assert file_path.read_bytes() == content
+        # The file has the permissions of a newly created file
+        reference_path = Path(tmp_path, "reference.bin")
+        reference_path.touch()
+        assert file_path.stat().st_mode == reference_path.stat().st_mode
+
+    @pytest.mark.asyncio
+    async def test_download_async_disk_full(
+        self, onedrive, mock_graph_api, tmp_path, monkeypatch
+    ):
+        def posix_fallocate(fd, offset, length):
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+        monkeypatch.setattr(os, "posix_fallocate", posix_fallocate, raising=False)
+        download_url = "https://public.dm.files.1drv.com/download"
+        mock_graph_api.snapshot()
+        route = mock_graph_api.get(download_url)
+        file_path = Path(tmp_path, "download.bin")
+        with pytest.raises(OSError) as excinfo:
+            await onedrive._download_async(download_url, file_path, 1024)
+        mock_graph_api.rollback()
+        assert excinfo.value.errno == errno.ENOSPC
+        assert route.call_count == 0
+        assert not file_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_download_async_fallocate_unsupported(
+        self, onedrive, mock_graph_api, tmp_path, monkeypatch
+    ):
+        def posix_fallocate(fd, offset, length):
+            raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+
+        monkeypatch.setattr(os, "posix_fallocate", posix_fallocate, raising=False)
+        content = os.urandom(1024)
+        download_url = "https://public.dm.files.1drv.com/download"
+        mock_graph_api.snapshot()
+        mock_graph_api.get(download_url).mock(
+            return_value=httpx.Response(206, content=content)
+        )
+        file_path = Path(tmp_path, "download.bin")
+        await onedrive._download_async(download_url, file_path, len(content))
+        mock_graph_api.rollback()
+        assert file_path.read_bytes() == content
+
+    @pytest.mark.asyncio
+    async def test_download_async_throttled(self, onedrive, mock_graph_api, tmp_path):
+        content = os.urandom(1024)
+        download_url = "https://public.dm.files.1drv.com/download"
+        mock_graph_api.snapshot()
+        mock_graph_api.get(download_url).mock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(206, content=content),
+            ]
+        )
+        file_path = Path(tmp_path, "download.bin")
+        await onedrive._download_async(download_url, file_path, len(content))
+        mock_graph_api.rollback()
+        assert file_path.read_bytes() == content
+
+    @pytest.mark.asyncio
+    async def test_download_async_replace(self, onedrive, mock_graph_api, tmp_path):
+        content = os.urandom(1024)
+        download_url = "https://public.dm.files.1drv.com/download"
+        mock_graph_api.snapshot()
+        mock_graph_api.get(download_url).mock(
+            return_value=httpx.Response(206, content=content)
+        )
+        file_path = Path(tmp_path, "download.bin")
+        file_path.write_bytes(b"previous")
+        file_path.chmod(0o640)
+        await onedrive._download_async(download_url, file_path, len(content))
+        mock_graph_api.rollback()
+        assert file_path.read_bytes() == content
+        assert stat.S_IMODE(file_path.stat().st_mode) == 0o640
+        assert list(tmp_path.iterdir()) == [file_path]
+
+    @pytest.mark.asyncio
+    async def test_download_async_failure(self, onedrive, mock_graph_api, tmp_path):
+        download_url = "https://public.dm.files.1drv.com/download"
+        mock_graph_api.snapshot()
+        mock_graph_api.get(download_url).mock(return_value=httpx.Response(404))
+        file_path = Path(tmp_path, "download.bin")
+        file_path.write_bytes(b"previous")
+        with pytest.raises(GraphAPIError) as excinfo:
+            await onedrive._download_async(download_url, file_path, 1024)
+        mock_graph_api.rollback()
+        (msg,) = excinfo.value.args
+        assert msg.startswith("item not downloaded")
+        # The existing local copy is kept and the temporary file removed
+        assert file_path.read_bytes() == b"previous"
+        assert list(tmp_path.iterdir()) == [file_path]
 
 
 class TestUpload:
@@ -1172,47 +2063,231 @@ class TestUpload:
 
     # upload_file
     @pytest.mark.parametrize(
-        "new_file_name, parent_folder_id, if_exists, size",
+        "new_file_name, parent_folder_id, if_exists, size, chunk_size",
         [
-            (None, None, "rename", 1024),
-            (None, None, "fail", 1000),
-            (None, None, "replace", 25446),
-            ("hello hello_there-01", None, "rename", 87486),
-            ("large_archive.zip", None, "rename", 5791757),
-            ("my_movie.mov", "01BYE5RZ5MYLM2SMX75ZBIPQZIHT6OAYPB", "rename", 485),
+            (None, None, "rename", 1024, None),
+            (None, None, "fail", 1000, None),
+            (None, None, "replace", 25446, None),
+            ("hello hello_there-01", None, "rename", 87486, None),
+            ("large_archive.zip", None, "rename", 5791757, None),
+            ("large_archive.zip", None, "rename", 5791757, 327680 * 16),
+            ("small_chunks.zip", None, "rename", 1000000, 327680),
+            ("my_movie.mov", "01BYE5RZ5MYLM2SMX75ZBIPQZIHT6OAYPB", "rename", 485, None),
         ],
     )
     def test_upload_file(
-        self, onedrive, tmp_path, new_file_name, parent_folder_id, if_exists, size
+        self,
+        onedrive,
+        tmp_path,
+        new_file_name,
+        parent_folder_id,
+        if_exists,
+        size,
+        chunk_size,
     ):
-        # Make a temporary file, at least one case should be larger than the upload chunk size (5MiB)
+        # Make a temporary file, some cases should be larger than the upload chunk size
         temp_dir = Path(tmp_path, "temp_upload")
         temp_dir.mkdir()
         file_path = Path(temp_dir, "temp_file.txt")
         file_path.write_bytes(os.urandom(size))
         # Make the request
         item_id = onedrive.upload_file(
-            file_path, new_file_name, parent_folder_id, if_exists
+            file_path, new_file_name, parent_folder_id, if_exists, chunk_size=chunk_size
         )
         assert item_id == "91231001"
 
+    def test_upload_file_mmap(self, onedrive, mock_graph_api, monkeypatch, tmp_path):
+        # Memory map every file so the small test file uses the large file path
+        monkeypatch.setattr(onedrive, "_UPLOAD_MMAP_MIN_SIZE", 0)
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp_file.txt")
+        content = os.urandom(1000000)
+        file_path.write_bytes(content)
+        item_id = onedrive.upload_file(file_path, chunk_size=327680)
+        assert item_id == "91231001"
+        last_request = mock_graph_api.routes["upload_item"].calls.last.request
+        assert last_request.content == content[327680 * 3 :]
+
+    @pytest.mark.parametrize("compress, ext", [("gzip", ".gz"), ("zstd", ".zst")])
+    def test_upload_file_compress(
+        self, onedrive, mock_graph_api, tmp_path, compress, ext
+    ):
+        if compress == "zstd" and not _onedrive.optionals_zstd:
+            pytest.skip("zstandard not installed")
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp_file.csv")
+        content = b"id,name\n" + b"1,example\n" * 10000
+        file_path.write_bytes(content)
+        item_id = onedrive.upload_file(file_path, compress=compress)
+        assert item_id == "91231001"
+        session_request = mock_graph_api.routes["upload_session"].calls.last.request
+        assert session_request.url.path.endswith(
+            f"temp_file.csv{ext}:/createUploadSession"
+        )
+        uploaded = mock_graph_api.routes["upload_item"].calls.last.request.content
+        assert len(uploaded) < len(content)
+        if compress == "gzip":
+            assert gzip.decompress(uploaded) == content
+        else:
+            decompressor = _onedrive.zstandard.ZstdDecompressor().decompressobj()
+            assert decompressor.decompress(uploaded) == content
+
+    @pytest.mark.parametrize(
+        "parent_folder_id, size, route_name",
+        [
+            (None, 1000, "upload_simple"),
+            ("01BYE5RZ5MYLM2SMX75ZBIPQZIHT6OAYPB", 4 * 1024 * 1024, "upload_simple"),
+            (None, 4 * 1024 * 1024 + 1, "upload_item"),
+        ],
+    )
+    def test_upload_file_simple(
+        self, onedrive, mock_graph_api, tmp_path, parent_folder_id, size, route_name
+    ):
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp file.txt")
+        file_path.write_bytes(os.urandom(size))
+        route = mock_graph_api.routes[route_name]
+        call_count = route.call_count
+        item_id = onedrive.upload_file(
+            file_path, parent_folder_id=parent_folder_id, keep_timestamps=False
+        )
+        assert item_id == "91231001"
+        assert route.call_count - call_count == 1
+        # The whole file is sent in one request, so the transfer timeouts apply
+        timeout = route.calls.last.request.extensions["timeout"]
+        assert timeout["write"] == 180.0
+
+    def test_upload_file_adaptive(
+        self, onedrive, mock_graph_api, monkeypatch, tmp_path
+    ):
+        # Start small so the quick mocked segments double in size
+        monkeypatch.setattr(onedrive, "_UPLOAD_CHUNK_START", 327680)
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp_file.txt")
+        file_path.write_bytes(os.urandom(1000000))
+        route = mock_graph_api.routes["upload_item"]
+        call_count = route.call_count
+        item_id = onedrive.upload_file(file_path)
+        assert item_id == "91231001"
+        content_ranges = [
+            call.request.headers["Content-Range"] for call in route.calls[call_count:]
+        ]
+        assert content_ranges == [
+            "bytes 0-327679/1000000",
+            "bytes 327680-983039/1000000",
+            "bytes 983040-999999/1000000",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_read_segment(self, onedrive, tmp_path):
+        file_path = Path(tmp_path, "temp_file.txt")
+        content = os.urandom(2500)
+        file_path.write_bytes(content)
+        with open(file_path, "rb") as file:
+            # Pieces share a reused buffer so each is copied before the next is read
+            pieces = [
+                bytes(piece)
+                async for piece in onedrive._read_segment(file, 100, 2300, 1000)
+            ]
+        assert [len(piece) for piece in pieces] == [1000, 1000, 300]
+        assert b"".join(pieces) == content[100:2400]
+
+    @pytest.mark.parametrize(
+        "chunk_size, elapsed, exp_chunk_size",
+        [
+            (327680 * 16, 0.5, 327680 * 32),
+            (327680 * 128, 0.5, 327680 * 187),
+            (327680 * 16, 3.0, 327680 * 16),
+            (327680 * 16, 20.0, 327680 * 8),
+            (327680 * 3, 20.0, 327680),
+            (327680, 20.0, 327680),
+        ],
+    )
+    def test_adapt_chunk_size(self, onedrive, chunk_size, elapsed, exp_chunk_size):
+        assert onedrive._adapt_chunk_size(chunk_size, elapsed) == exp_chunk_size
+
     def test_upload_file_verbose(self, onedrive, tmp_path, capsys):
         # Make a temporary file, at least one case should be larger than the upload chunk size (5MiB)
         temp_dir = Path(tmp_path, "temp_upload")
         temp_dir.mkdir()
         file_path = Path(temp_dir, "temp_file.txt")
         file_path.write_bytes(os.urandom(5791757))
-        onedrive.upload_file(file_path, verbose=True)
+        onedrive.upload_file(file_path, verbose=True, chunk_size=327680 * 16)
         stdout, sterr = capsys.readouterr()
         assert (
             stdout == "Requesting upload session\n"
             "File temp_file.txt will be uploaded in 2 segments\n"
             "Loading file\n"
             "Uploading segment 1/2\n"
-            "Uploading segment 2/2 (~50% complete)\n"
+            "Uploading segment 2/2 (~90% complete)\n"
             "Upload complete\n"
         )
 
+    def test_upload_file_throttled(self, onedrive, mock_graph_api, tmp_path):
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        route = mock_graph_api.routes["upload_item"]
+        route.snapshot()
+        side_effect = route.side_effect
+        responses = iter([httpx.Response(503, headers={"Retry-After": "0"})])
+        route.side_effect = lambda request: next(responses, None) or side_effect(
+            request
+        )
+        call_count = route.call_count
+        item_id = onedrive.upload_file(file_path)
+        assert item_id == "91231001"
+        assert route.call_count - call_count == 2
+        route.rollback()
+
+    def test_upload_file_failure_segment(self, onedrive, mock_graph_api, tmp_path):
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp_file.txt")
+        file_path.write_bytes(os.urandom(1000000))
+        route = mock_graph_api.routes["upload_item"]
+        route.snapshot()
+        route.side_effect = None
+        route.return_value = httpx.Response(
+            400, json={"error": {"message": "Invalid request"}}
+        )
+        delete_route = mock_graph_api.routes["delete_upload_session"]
+        call_count = delete_route.call_count
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.upload_file(file_path, chunk_size=327680)
+        (msg,) = excinfo.value.args
+        assert msg == "could not upload chuck 1 of 4 (Invalid request)"
+        assert delete_route.call_count - call_count == 1
+        assert "Authorization" not in delete_route.calls.last.request.headers
+        route.rollback()
+
+    def test_upload_file_failure_final_segment(
+        self, onedrive, mock_graph_api, tmp_path
+    ):
+        temp_dir = Path(tmp_path, "temp_upload")
+        temp_dir.mkdir()
+        file_path = Path(temp_dir, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        route = mock_graph_api.routes["upload_item"]
+        route.snapshot()
+        route.side_effect = None
+        route.return_value = httpx.Response(
+            409, json={"error": {"message": "Name already exists"}}
+        )
+        delete_route = mock_graph_api.routes["delete_upload_session"]
+        call_count = delete_route.call_count
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.upload_file(file_path)
+        (msg,) = excinfo.value.args
+        assert msg == "item not uploaded (Name already exists)"
+        assert delete_route.call_count - call_count == 1
+        route.rollback()
+
     def test_upload_file_failure(self, onedrive, tmp_path):
         # Make a temporary file, at least one case should be larger than the upload chunk size (5MiB)
         temp_dir = Path(tmp_path, "temp_upload")
@@ -1246,6 +2321,38 @@ class TestUpload:
         (msg,) = excinfo.value.args
         assert msg == "if_exists expected 'fail', 'replace', or 'rename', got 'delete'"
 
+    @pytest.mark.parametrize("chunk_size", [0, 1000, 327680 * 192])
+    def test_upload_file_failure_chunk_size(self, onedrive, chunk_size):
+        with pytest.raises(ValueError) as excinfo:
+            onedrive.upload_file("file_path", chunk_size=chunk_size)
+        (msg,) = excinfo.value.args
+        assert msg == (
+            "chunk_size expected a multiple of 320KiB less than 60MiB, "
+            f"got {chunk_size}"
+        )
+
+    def test_upload_file_failure_compress(self, onedrive):
+        with pytest.raises(ValueError) as excinfo:
+            onedrive.upload_file("file_path", compress="bz2")
+        (msg,) = excinfo.value.args
+        assert msg == "compress expected 'gzip' or 'zstd', got 'bz2'"
+
+    def test_upload_file_failure_compress_zstd(self, onedrive, monkeypatch):
+        monkeypatch.setattr(_onedrive, "optionals_zstd", False)
+        with pytest.raises(ValueError) as excinfo:
+            onedrive.upload_file("file_path", compress="zstd")
+        (msg,) = excinfo.value.args
+        assert msg == (
+            "compress was 'zstd' but zstandard is not installed, "
+            "Hint: 'pip install zstandard'"
+        )
+
+    def test_upload_file_failure_chunk_size_type(self, onedrive):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.upload_file("file_path", chunk_size=1.5)
+        (msg,) = excinfo.value.args
+        assert msg == "chunk_size expected 'int', got 'float'"
+
     def test_upload_file_failure_bad_path(self, onedrive):
         with pytest.raises(ValueError) as excinfo:
             onedrive.upload_file("non-existing")
@@ -1254,6 +2361,128 @@ class TestUpload:
             msg == "file_path expected a path to an existing file, got 'non-existing'"
         )
 
+    # upload_files
+    def test_upload_files(self, onedrive, mock_graph_api, tmp_path):
+        file_paths = []
+        for n, size in enumerate((100, 25446, 5791757)):
+            file_path = Path(tmp_path, f"temp_file_{n}.txt")
+            file_path.write_bytes(os.urandom(size))
+            file_paths.append(file_path)
+        batch_count = mock_graph_api.routes["batch"].call_count
+        session_count = mock_graph_api.routes["upload_session"].call_count
+        item_ids = onedrive.upload_files(file_paths, max_connections=2)
+        assert item_ids == ["91231001"] * 3
+        # The upload sessions are all created within a single batch request
+        assert mock_graph_api.routes["batch"].call_count == batch_count + 1
+        assert mock_graph_api.routes["upload_session"].call_count == session_count + 3
+
+    def test_upload_files_simple(self, onedrive, mock_graph_api, tmp_path):
+        file_paths: list[str | Path] = []
+        for n, size in enumerate((100, 5791757, 4 * 1024 * 1024)):
+            file_path = Path(tmp_path, f"temp_file_{n}.txt")
+            file_path.write_bytes(os.urandom(size))
+            file_paths.append(file_path)
+        # Escape slashes are removed from the paths like upload_file
+        file_paths[0] = os.path.join(tmp_path, "temp\\_file_0.txt")
+        simple_count = mock_graph_api.routes["upload_simple"].call_count
+        session_count = mock_graph_api.routes["upload_session"].call_count
+        item_ids = onedrive.upload_files(file_paths, keep_timestamps=False)
+        assert item_ids == ["91231001"] * 3
+        # Only the file larger than 4MiB needs an upload session
+        assert mock_graph_api.routes["upload_simple"].call_count == simple_count + 2
+        assert mock_graph_api.routes["upload_session"].call_count == session_count + 1
+
+    def test_upload_files_simple_only(self, onedrive, mock_graph_api, tmp_path):
+        file_path = Path(tmp_path, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        batch_count = mock_graph_api.routes["batch"].call_count
+        item_ids = onedrive.upload_files([file_path], keep_timestamps=False)
+        assert item_ids == ["91231001"]
+        assert mock_graph_api.routes["batch"].call_count == batch_count
+
+    def test_upload_files_failure(self, onedrive, mock_graph_api, tmp_path):
+        file_path = Path(tmp_path, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        upload_count = mock_graph_api.routes["upload_item"].call_count
+        with pytest.raises(GraphAPIError) as excinfo:
+            onedrive.upload_files([file_path], parent_folder_id="not-valid-id")
+        (msg,) = excinfo.value.args
+        assert msg == "upload session could not be created (Invalid request)"
+        assert mock_graph_api.routes["upload_item"].call_count == upload_count
+
+    def test_upload_files_failure_segment(self, onedrive, mock_graph_api, tmp_path):
+        file_path = Path(tmp_path, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        mock_graph_api.routes["upload_item"].snapshot()
+        mock_graph_api.routes["upload_item"].side_effect = None
+        mock_graph_api.routes["upload_item"].return_value = httpx.Response(
+            400, json={"error": {"message": "Invalid request"}}
+        )
+        delete_count = mock_graph_api.routes["delete_upload_session"].call_count
+        with pytest.raises(GraphAPIError):
+            onedrive.upload_files([file_path])
+        mock_graph_api.routes["upload_item"].rollback()
+        # The created upload session is cancelled
+        assert (
+            mock_graph_api.routes["delete_upload_session"].call_count
+            == delete_count + 1
+        )
+
+    def test_upload_files_failure_bad_path(self, onedrive, mock_graph_api, tmp_path):
+        file_path = Path(tmp_path, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        batch_count = mock_graph_api.routes["batch"].call_count
+        with pytest.raises(ValueError) as excinfo:
+            onedrive.upload_files([file_path, "non-existing"])
+        (msg,) = excinfo.value.args
+        assert (
+            msg == "file_path expected a path to an existing file, got 'non-existing'"
+        )
+        assert mock_graph_api.routes["batch"].call_count == batch_count
+
+    @pytest.mark.asyncio
+    async def test_upload_files_failure_running_loop(
+        self, onedrive, mock_graph_api, tmp_path
+    ):
+        file_path = Path(tmp_path, "temp_file.txt")
+        file_path.write_bytes(os.urandom(100))
+        batch_count = mock_graph_api.routes["batch"].call_count
+        with pytest.raises(RuntimeError) as excinfo:
+            onedrive.upload_files([file_path])
+        (msg,) = excinfo.value.args
+        assert msg.startswith("upload_files cannot be called from a running event loop")
+        assert mock_graph_api.routes["batch"].call_count == batch_count
+
+    @pytest.mark.parametrize(
+        "file_paths, parent_folder_id, max_connections, exp_msg",
+        [
+            ("file_path", None, 4, "file_paths expected 'list', got 'str'"),
+            (
+                [123],
+                None,
+                4,
+                "file_paths expected list of 'str' or 'Path', got 'int' item",
+            ),
+            (["str"], 123, 4, "parent_folder_id expected 'str', got 'int'"),
+            (["str"], None, 1.5, "max_connections expected 'int', got 'float'"),
+        ],
+    )
+    def test_upload_files_failure_type(
+        self, onedrive, file_paths, parent_folder_id, max_connections, exp_msg
+    ):
+        with pytest.raises(TypeError) as excinfo:
+            onedrive.upload_files(
+                file_paths, parent_folder_id, max_connections=max_connections
+            )
+        (msg,) = excinfo.value.args
+        assert msg == exp_msg
+
+    def test_upload_files_failure_value(self, onedrive):
+        with pytest.raises(ValueError) as excinfo:
+            onedrive.upload_files(["file_path"], if_exists="delete")
+        (msg,) = excinfo.value.args
+        assert msg == "if_exists expected 'fail', 'replace', or 'rename', got 'delete'"
+
     # _get_local_file_metadata
     def test_get_local_file_metadata(self, onedrive):
         file_path = os.path.join(TESTS_DIR, "__init__.py")
@@ -48,6 +48,13 @@ def mock_graph_api():
     # Create the mocked routes
     # IMPORTANT: routes ordered by most specific top as respx it will use first match
     with respx.mock(base_url=api_url, assert_all_called=False) as respx_mock:
+        # Batch, dispatches each request to the other mocked routes
+        batch_route = respx_mock.post(
+            path__regex=r"\$batch$",
+            headers=headers,
+            name="batch",
+        ).mock(side_effect=lambda request: side_effect_batch(request, respx_mock))
+
         # Make folder
         make_folder_route = respx_mock.post(
             path__regex=r"me/drive/(?:root|items/[0-9a-zA-Z-]+)/children$",
@@ -117,6 +124,13 @@ def mock_graph_api():
             name="upload_session",
         ).mock(side_effect=side_effect_upload_session)
 
+        # Upload Small File
+        upload_simple_route = respx_mock.put(
+            path__regex=r"me/drive/(?:root|items/[0-9a-zA-Z-]+):/[0-9a-zA-Z-_.%+ ]+:/content$",
+            headers=headers,
+            name="upload_simple",
+        ).mock(side_effect=side_effect_upload_simple)
+
         # Upload File Delete Session
         # host specified as not using base_url
         upload_session_delete_route = respx_mock.delete(
@@ -142,7 +156,7 @@ def mock_graph_api():
 
         # Detail item from path
         detail_item_path_route = respx_mock.get(
-            path__regex=r"me/drive/root:/[0-9a-zA-Z/-_.%+ ]+",
+            path__regex=r"me/drive/(?:root|items/[0-9a-zA-Z-]+):/[0-9a-zA-Z/-_.%+ ]+",
             headers=headers,
             name="detail_item_path",
         ).mock(side_effect=side_effect_detail_item_path)
@@ -155,6 +169,34 @@ def mock_graph_api():
         yield respx_mock
 
 
+def side_effect_batch(request, respx_mock):
+    body = json.loads(request.content)
+    if len(body["requests"]) > 20:
+        return httpx.Response(400, json=MOCKED_RESPONSE_DATA["invalid-request"])
+    responses = []
+    for item in body["requests"]:
+        sub_request = httpx.Request(
+            item["method"],
+            "https://graph.microsoft.com/v1.0" + item["url"],
+            headers={
+                "Accept": request.headers["Accept"],
+                "Authorization": request.headers["Authorization"],
+            },
+            json=item.get("body"),
+        )
+        sub_response = respx_mock.handler(sub_request)
+        sub_response.read()
+        response = {
+            "id": item["id"],
+            "status": sub_response.status_code,
+            "headers": dict(sub_response.headers),
+        }
+        if sub_response.content:
+            response["body"] = sub_response.json()
+        responses.append(response)
+    return httpx.Response(200, json={"responses": responses})
+
+
 def side_effect_detail_item(request):
     item_id_match = re.search("items/([0-9a-zA-Z-]+)", request.url.path)
     if not item_id_match:
@@ -169,19 +211,28 @@ def side_effect_detail_item(request):
 
 
 def side_effect_detail_item_path(request):
-    path_match = re.search("root:/([0-9a-zA-Z/-_.%+ ]+)", request.url.path)
+    path_match = re.search(
+        "(root|items/[0-9a-zA-Z-]+):/([0-9a-zA-Z/-_.%+ ]+)", request.url.path
+    )
     if not path_match:
         return httpx.Response(400, json=MOCKED_RESPONSE_DATA["invalid-request"])
-    # Check items for a matching path
-    path_request = "/drive/root:/" + path_match.group(1)
-    for item in MOCKED_ITEMS_ALL:
-        item_path = item.get("parentReference", {}).get("path") + "/" + item.get("name")
-        if item_path == path_request:
-            matching_item = item
-            break
+    # Check items for a matching path, relative to the root or a parent item
+    if path_match.group(1) == "root":
+        path_request = "/drive/root:/" + path_match.group(2)
+        for item in MOCKED_ITEMS_ALL:
+            item_path = (
+                item.get("parentReference", {}).get("path") + "/" + item.get("name")
+            )
+            if item_path == path_request:
+                return httpx.Response(200, json=item)
     else:
-        return httpx.Response(400, json=MOCKED_RESPONSE_DATA["invalid-request"])
-    return httpx.Response(200, json=matching_item)
+        parent_id = path_match.group(1).removeprefix("items/")
+        name = path_match.group(2)
+        for item in MOCKED_ITEMS_ALL:
+            item_parent_id = item.get("parentReference", {}).get("id")
+            if item_parent_id == parent_id and item.get("name") == name:
+                return httpx.Response(200, json=item)
+    return httpx.Response(404, json=MOCKED_RESPONSE_DATA["item-not-found"])
 
 
 def side_effect_drive_details(request):
@@ -439,6 +490,24 @@ def side_effect_upload_session(request):
     return httpx.Response(200, json=MOCKED_RESPONSE_DATA["upload-session"])
 
 
+def side_effect_upload_simple(request):
+    # If a parent folder is specified, check it exists
+    parent_id_re = re.search("items/([0-9a-zA-Z-]+)", request.url.path)
+    if parent_id_re and not [
+        item
+        for item in MOCKED_ITEMS_ROOT
+        if item.get("id") == parent_id_re.group(1) and "folder" in item
+    ]:
+        return httpx.Response(400, json=MOCKED_RESPONSE_DATA["invalid-request"])
+    # Check the conflict behavior and size limit of simple uploads
+    conflict_behavior = request.url.params.get("@microsoft.graph.conflictBehavior")
+    if conflict_behavior not in ("rename", "replace", "fail"):
+        return httpx.Response(400, json=MOCKED_RESPONSE_DATA["invalid-request"])
+    if len(request.content) > 4 * 1024 * 1024:
+        return httpx.Response(413, json=MOCKED_RESPONSE_DATA["invalid-request"])
+    return httpx.Response(201, json=MOCKED_RESPONSE_DATA["upload-complete"])
+
+
 def side_effect_upload_item(request):
     # Load headers
     try:
@@ -458,6 +527,9 @@ def side_effect_upload_item(request):
         or content_range_end >= file_size
     ):
         return httpx.Response(416, json=MOCKED_RESPONSE_DATA["invalid-request"])
+    # Check the whole segment was sent
+    if len(request.content) != content_range_end - content_range_start + 1:
+        return httpx.Response(400, json=MOCKED_RESPONSE_DATA["invalid-request"])
     # Check if this is the last chunk
     if content_range_end != (file_size - 1):
         response_json = {